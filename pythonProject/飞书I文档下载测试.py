@@ -1,13 +1,8 @@
 import os
-import re
-import requests
-import pandas as pd
 from datetime import datetime
-
-# 飞书 API 配置
-APP_ID = "cli_a72e948d61d2900e"
-APP_SECRET = "DiWuiC8pF7SjZOknpehdvgXWZBmUMann"
-ACCESS_TOKEN_URL = "https://open.feishu.cn/open-apis/auth/v3/tenant_access_token/internal"
+from 飞书客户端 import APP_ID, APP_SECRET, get_tenant_access_token
+from 飞书多维表格 import (build_frame, get_app_name, get_field_names, iter_record_pages, parse_bitable_url,
+                          write_records_csv)
 
 
 def get_desktop_path():
@@ -16,71 +11,8 @@ def get_desktop_path():
 
 
 def get_access_token():
-    """获取访问令牌"""
-    payload = {"app_id": APP_ID, "app_secret": APP_SECRET}
-    try:
-        response = requests.post(ACCESS_TOKEN_URL, json=payload, timeout=10)
-        response.raise_for_status()
-        return response.json().get("tenant_access_token")
-    except Exception as e:
-        print(f"❌ 获取Token失败: {str(e)}")
-        return None
-
-
-def parse_document_url(document_url):
-    """解析多维表格URL"""
-    pattern = r"/base/([a-zA-Z0-9_]+).*table=([a-zA-Z0-9_]+)"
-    match = re.search(pattern, document_url)
-    if not match:
-        return None, None
-    return match.group(1), match.group(2)
-
-
-def get_app_name(access_token, base_token):
-    """获取多维表格应用名称"""
-    url = f"https://open.feishu.cn/open-apis/bitable/v1/apps/{base_token}"
-    headers = {"Authorization": f"Bearer {access_token}"}
-    try:
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-        return response.json().get("data", {}).get("name", "未知文档")
-    except Exception as e:
-        print(f"⚠️ 获取文档名称失败: {str(e)}")
-        return "飞书文档"
-
-
-def get_table_data(access_token, base_token, table_id):
-    """获取完整表格数据（自动分页）"""
-    headers = {"Authorization": f"Bearer {access_token}"}
-    url = f"https://open.feishu.cn/open-apis/bitable/v1/apps/{base_token}/tables/{table_id}/records"
-
-    all_records = []
-    page_token = ""
-    while True:
-        params = {"page_size": 100}
-        if page_token:
-            params["page_token"] = page_token
-
-        try:
-            response = requests.get(url, headers=headers, params=params, timeout=15)
-            response.raise_for_status()
-            data = response.json()
-
-            if data.get("code") != 0:
-                print(f"❌ API返回错误: {data.get('msg')}")
-                return None
-
-            all_records.extend(data.get("data", {}).get("items", []))
-
-            if not data.get("data", {}).get("has_more"):
-                break
-
-            page_token = data.get("data", {}).get("page_token", "")
-        except Exception as e:
-            print(f"❌ 获取数据失败: {str(e)}")
-            return None
-
-    return {"data": {"items": all_records}}
+    """获取访问令牌，未到期时直接使用缓存"""
+    return get_tenant_access_token(APP_ID, APP_SECRET)
 
 
 def save_to_file(df, save_path, file_name, file_format):
@@ -98,6 +30,18 @@ def save_to_file(df, save_path, file_name, file_format):
         return False
 
 
+def export_csv(access_token, base_token, table_id, save_path, file_name):
+    """逐页写入 CSV，内存中只保留当前页"""
+    full_path = os.path.join(save_path, f"{file_name}.csv")
+    columns = get_field_names(access_token, base_token, table_id)
+    rows = write_records_csv(iter_record_pages(access_token, base_token, table_id), full_path, columns)
+    if rows == 0:
+        os.remove(full_path)
+        print("❌ 未获取到有效数据。")
+        return
+    print(f"✅ 文件已保存至：{full_path}（共 {rows} 行）")
+
+
 def main():
     try:
         # 获取访问令牌
@@ -112,29 +56,20 @@ def main():
             print("❌ URL不能为空，请重新输入。")
             return
 
-        base_token, table_id = parse_document_url(document_url)
+        base_token, table_id = parse_bitable_url(document_url)
         if not all([base_token, table_id]):
             print("❌ URL格式错误，请确认包含/base/和table参数。")
             return
 
         # 获取文档信息
-        doc_name = get_app_name(access_token, base_token)
+        try:
+            doc_name = get_app_name(access_token, base_token)
+        except Exception as e:
+            print(f"⚠️ 获取文档名称失败: {str(e)}")
+            doc_name = "飞书文档"
         file_name = f"{doc_name}_{datetime.now().strftime('%Y%m%d%H%M')}"  # 确保这里不包含文件扩展名
 
-        # 获取表格数据
-        print("⏳ 正在获取表格数据...")
-        content = get_table_data(access_token, base_token, table_id)
-        if not content:
-            print("❌ 获取表格数据失败，请检查网络连接或API权限。")
-            return
-
-        # 处理数据
-        df = pd.DataFrame([item["fields"] for item in content["data"]["items"]])
-        if df.empty:
-            print("❌ 未获取到有效数据。")
-            return
-
-        # 保存文件
+        # 先选择导出格式，CSV 可以边获取边写入
         desktop_path = get_desktop_path()
         print("请选择导出格式：")
         print("1. Excel 文件 (.xlsx)")
@@ -143,6 +78,21 @@ def main():
 
         file_format = "xlsx" if choice == "1" else "csv"
         print(f"Saving file as {file_format} format...")  # 调试输出
+
+        # 获取表格数据，按页流式处理
+        print("⏳ 正在获取表格数据...")
+        try:
+            if file_format == "csv":
+                export_csv(access_token, base_token, table_id, desktop_path, file_name)
+                return
+            df = build_frame(iter_record_pages(access_token, base_token, table_id))
+        except Exception as e:
+            print(f"❌ 获取表格数据失败，请检查网络连接或API权限: {str(e)}")
+            return
+
+        if df.empty:
+            print("❌ 未获取到有效数据。")
+            return
         save_to_file(df, desktop_path, file_name, file_format)
 
     except Exception as e:
@@ -0,0 +1,170 @@
+import queue
+import re
+import threading
+import pandas as pd
+from 飞书客户端 import api_get
+
+# 整体功能实现：多维表格记录按页流式读取，后台线程预取后续页面，下游边接收边处理（写 CSV、清洗、生成 DataFrame），
+# 内存中只保留少量原始页面，网络等待与数据处理重叠进行
+
+# 每页记录数，记录接口上限为 500
+record_page_size = 500
+field_page_size = 100
+# 预取页数上限，即内存中同时存在的未处理页面数
+prefetch_pages = 2
+
+
+def parse_bitable_url(document_url):
+    """
+    解析多维表格URL
+    :return: (base_token, table_id)，URL 中没有 table 参数时 table_id 为 None；不是多维表格URL时都为 None
+    """
+    base_match = re.search(r"/base/([a-zA-Z0-9_]+)", document_url)
+    if not base_match:
+        return None, None
+    table_match = re.search(r"table=([a-zA-Z0-9_]+)", document_url)
+    return base_match.group(1), table_match.group(1) if table_match else None
+
+
+def get_json(access_token, path, params=None, throttle=None):
+    """
+    请求接口并检查返回码
+    :param access_token: 令牌，或每次请求时调用以取得当前令牌的函数（见 飞书客户端.make_token_provider）；
+                         本模块其他函数的 access_token 参数同样可以传入该函数
+    :param throttle: 每次请求前调用的限频函数，见 飞书客户端.make_rate_limiter
+    :return: 返回内容中的 data 部分，返回码不为 0 时抛出 ValueError
+    """
+    if throttle:
+        throttle()
+    token = access_token() if callable(access_token) else access_token
+    headers = {"Authorization": f"Bearer {token}"}
+    response = api_get(path, headers=headers, params=params)
+    response.raise_for_status()
+    data = response.json()
+    if data.get("code") != 0:
+        raise ValueError(f"API返回错误: {data.get('msg')}")
+    return data.get("data") or {}
+
+
+def iter_pages(access_token, path, page_size, throttle=None):
+    """按 page_token 逐页产出接口返回的 items"""
+    page_token = ""
+    while True:
+        params = {"page_size": page_size}
+        if page_token:
+            params["page_token"] = page_token
+        data = get_json(access_token, path, params, throttle)
+        yield data.get("items") or []
+        if not data.get("has_more"):
+            break
+        page_token = data.get("page_token", "")
+
+
+def prefetch(iterator, size=None):
+    """
+    在后台线程中提前取出 iterator 的后续元素，缓冲区满时暂停；后台出现的异常在取数处重新抛出，
+    下游提前停止读取时后台线程随之结束
+    :param size: 缓冲区大小，默认为 prefetch_pages
+    """
+    buffer = queue.Queue(maxsize=size or prefetch_pages)
+    stop = threading.Event()
+    done = object()
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for item in iterator:
+                if not put((item, None)):
+                    return
+            put((done, None))
+        except Exception as e:
+            put((done, e))
+
+    threading.Thread(target=produce, daemon=True).start()
+    try:
+        while True:
+            item, error = buffer.get()
+            if error is not None:
+                raise error
+            if item is done:
+                return
+            yield item
+    finally:
+        stop.set()
+
+
+def iter_record_pages(access_token, base_token, table_id, page_size=None, throttle=None):
+    """
+    逐页产出记录，处理当前页时后台已在获取下一页
+    :return: 生成器，每次产出一页记录的 fields 列表
+    """
+    path = f"/bitable/v1/apps/{base_token}/tables/{table_id}/records"
+    for items in prefetch(iter_pages(access_token, path, page_size or record_page_size, throttle)):
+        yield [item.get("fields", {}) for item in items]
+
+
+def iter_records(access_token, base_token, table_id, page_size=None, throttle=None):
+    """逐条产出记录的 fields"""
+    for page in iter_record_pages(access_token, base_token, table_id, page_size, throttle):
+        yield from page
+
+
+def get_field_names(access_token, base_token, table_id, throttle=None):
+    """获取数据表的全部字段名，顺序与表格中一致"""
+    path = f"/bitable/v1/apps/{base_token}/tables/{table_id}/fields"
+    return [field["field_name"] for items in iter_pages(access_token, path, field_page_size, throttle) for field in items]
+
+
+def get_app_name(access_token, base_token, throttle=None):
+    """获取多维表格应用名称"""
+    data = get_json(access_token, f"/bitable/v1/apps/{base_token}", throttle=throttle)
+    return (data.get("app") or {}).get("name") or base_token
+
+
+def list_tables(access_token, base_token, throttle=None):
+    """
+    列出多维表格应用中的全部数据表
+    :return: [(table_id, 数据表名称)]
+    """
+    path = f"/bitable/v1/apps/{base_token}/tables"
+    return [(table["table_id"], table.get("name") or table["table_id"])
+            for items in iter_pages(access_token, path, field_page_size, throttle) for table in items]
+
+
+def write_records_csv(pages, file_path, columns, encoding="utf-8-sig"):
+    """
+    逐页追加写入 CSV，列固定为 columns（每条记录只包含非空字段，不能按第一页推断列）
+    :param pages: iter_record_pages 的结果
+    :return: 写入的行数
+    """
+    rows = 0
+    with open(file_path, "w", encoding=encoding, newline="") as f:
+        pd.DataFrame(columns=columns).to_csv(f, index=False)
+        for page in pages:
+            pd.DataFrame(page, columns=columns).to_csv(f, index=False, header=False)
+            rows += len(page)
+    return rows
+
+
+def build_frame(pages, transform=None):
+    """
+    逐页生成 DataFrame 并可先做清洗、筛列，最后合并，原始记录不会全部留在内存中
+    :param pages: iter_record_pages 的结果
+    :param transform: 处理单页 DataFrame 的函数
+    :return: 合并后的 DataFrame
+    """
+    frames = []
+    for page in pages:
+        df = pd.DataFrame(page)
+        frames.append(transform(df) if transform else df)
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True)
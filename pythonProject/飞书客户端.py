@@ -0,0 +1,207 @@
+import json
+import os
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# 整体功能实现：所有飞书接口共用一个带连接池的 Session，分页拉取时复用同一条长连接，
+# 不必每页重新建立 TCP 和 TLS 连接；统一设置默认超时和失败重试。
+# tenant_access_token 按有效期缓存在内存和本地文件中，多次运行共用，快到期时在后台刷新
+
+base_url = "https://open.feishu.cn/open-apis"
+
+# 飞书 API 配置，各脚本共用；凭证不写在代码中，从环境变量 FEISHU_APP_ID、FEISHU_APP_SECRET 读取
+APP_ID = os.environ.get("FEISHU_APP_ID")
+APP_SECRET = os.environ.get("FEISHU_APP_SECRET")
+
+# 连接池大小，即同时保持的长连接数，并发导出时不超过该值
+pool_size = 16
+# 默认超时（连接, 读取），单位秒
+default_timeout = (5, 15)
+# 网络错误和以下状态码最多重试的次数，间隔按 0.5、1、2 秒递增；429 时优先按 Retry-After 等待
+retry_total = 3
+retry_backoff = 0.5
+retry_status = (429, 500, 502, 503, 504)
+
+# 本进程的共享 Session 及创建它的进程号，子进程中会重新创建
+shared_session = None
+session_pid = None
+
+access_token_path = "/auth/v3/tenant_access_token/internal"
+token_cache_file = os.path.join(os.path.expanduser("~"), ".飞书令牌缓存.json")
+# 剩余有效期不足 token_refresh_margin 秒时在后台刷新（飞书在令牌剩余不足 30 分钟时才会发放新令牌），
+# 不足 token_min_ttl 秒时不再使用，保证取到的令牌至少够用一次导出
+token_refresh_margin = 1800
+token_min_ttl = 600
+
+# 内存中的令牌：{app_id: {'token': 令牌, 'expire_at': 到期时间戳}}
+cached_tokens = {}
+token_lock = threading.Lock()
+# 正在后台刷新令牌的应用
+refreshing_apps = set()
+
+
+def create_session():
+    """创建带连接池和重试的 Session"""
+    retry = Retry(
+        total=retry_total,
+        backoff_factor=retry_backoff,
+        status_forcelist=retry_status,
+        # 获取令牌的 POST 请求也可以安全重试
+        allowed_methods=frozenset(['GET', 'POST']),
+        respect_retry_after_header=True,
+        # 重试用完后返回最后一次的响应，由调用方按状态码处理
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_session():
+    """获取本进程共享的 Session"""
+    global shared_session, session_pid
+    if shared_session is None or session_pid != os.getpid():
+        shared_session = create_session()
+        session_pid = os.getpid()
+    return shared_session
+
+
+def request(method, url, timeout=None, **kwargs):
+    """
+    发送请求
+    :param method: 请求方法
+    :param url: 完整地址，或以 / 开头的接口路径（自动补全 base_url）
+    :param timeout: 超时时间，默认为 default_timeout
+    :return: requests.Response
+    """
+    if url.startswith('/'):
+        url = base_url + url
+    return get_session().request(method, url, timeout=timeout or default_timeout, **kwargs)
+
+
+def make_rate_limiter(rate):
+    """
+    生成限频函数，多个线程共用同一个函数时，请求按固定间隔排队，整体每秒不超过 rate 次
+    :param rate: 每秒请求数上限
+    :return: 无参函数，每次请求前调用，需要时会等待
+    """
+    interval = 1.0 / rate
+    lock = threading.Lock()
+    next_time = [time.monotonic()]
+
+    def wait():
+        with lock:
+            scheduled = max(time.monotonic(), next_time[0])
+            next_time[0] = scheduled + interval
+        delay = scheduled - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+    return wait
+
+
+def api_get(url, **kwargs):
+    return request("GET", url, **kwargs)
+
+
+def api_post(url, **kwargs):
+    return request("POST", url, **kwargs)
+
+
+def fetch_tenant_access_token(app_id, app_secret):
+    """
+    向飞书申请新的令牌
+    :return: {'token': 令牌, 'expire_at': 到期时间戳}，失败时返回 None
+    """
+    payload = {"app_id": app_id, "app_secret": app_secret}
+    try:
+        response = api_post(access_token_path, json=payload, timeout=10)
+        response.raise_for_status()
+        data = response.json()
+    except Exception as e:
+        print(f"❌ 获取Token失败: {str(e)}")
+        return None
+    if data.get("code") != 0 or not data.get("tenant_access_token"):
+        print(f"❌ 获取Token失败: {data.get('msg')}")
+        return None
+    return {'token': data["tenant_access_token"], 'expire_at': time.time() + data.get("expire", 7200)}
+
+
+def read_token_file():
+    """读取本地令牌缓存，不存在或损坏时返回空字典"""
+    try:
+        with open(token_cache_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def store_token(app_id, entry):
+    """令牌写入内存和本地文件，调用方需持有 token_lock"""
+    cached_tokens[app_id] = entry
+    tokens = read_token_file()
+    tokens[app_id] = entry
+    try:
+        temp_path = f'{token_cache_file}.{os.getpid()}.tmp'
+        # 令牌文件只允许当前用户读写
+        with open(os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), 'w', encoding='utf-8') as f:
+            json.dump(tokens, f)
+        os.replace(temp_path, token_cache_file)
+    except OSError as e:
+        print(f"⚠️ 令牌缓存无法保存: {str(e)}")
+
+
+def refresh_token(app_id, app_secret):
+    """在后台线程中刷新令牌，失败时保留原令牌，下次调用时再试"""
+    entry = fetch_tenant_access_token(app_id, app_secret)
+    with token_lock:
+        if entry:
+            store_token(app_id, entry)
+        refreshing_apps.discard(app_id)
+
+
+def get_tenant_access_token(app_id, app_secret):
+    """
+    获取 tenant_access_token：优先使用内存和本地文件中未到期的令牌，快到期时后台刷新；
+    没有可用令牌时同步申请，并发调用时只申请一次，其余调用方等待后直接使用新令牌
+    :return: 令牌，获取失败或未配置凭证时返回 None
+    """
+    if not app_id or not app_secret:
+        print("❌ 未配置飞书应用凭证，请设置环境变量 FEISHU_APP_ID 和 FEISHU_APP_SECRET。")
+        return None
+    with token_lock:
+        entry = cached_tokens.get(app_id)
+        if entry is None or entry['expire_at'] - time.time() < token_min_ttl:
+            entry = read_token_file().get(app_id)
+            if entry:
+                cached_tokens[app_id] = entry
+        if entry and entry['expire_at'] - time.time() >= token_min_ttl:
+            if entry['expire_at'] - time.time() < token_refresh_margin and app_id not in refreshing_apps:
+                refreshing_apps.add(app_id)
+                threading.Thread(target=refresh_token, args=(app_id, app_secret), daemon=True).start()
+            return entry['token']
+
+        entry = fetch_tenant_access_token(app_id, app_secret)
+        if entry is None:
+            return None
+        store_token(app_id, entry)
+        return entry['token']
+
+
+def make_token_provider(app_id, app_secret):
+    """
+    生成取令牌的函数，传给 飞书多维表格 的接口后每次请求都取当前令牌，长时间运行中令牌到期时自动换新
+    :return: 无参函数，返回可用的令牌，获取失败时抛出 ValueError
+    """
+    def get_token():
+        token = get_tenant_access_token(app_id, app_secret)
+        if not token:
+            raise ValueError("无法获取访问令牌")
+        return token
+
+    return get_token
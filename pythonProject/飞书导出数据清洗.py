@@ -1,17 +1,15 @@
 import os
-import re
-import requests
 import pandas as pd
 from datetime import datetime
 import openpyxl
 from openpyxl.styles import Font, PatternFill
+from 飞书客户端 import APP_ID, APP_SECRET, get_tenant_access_token
+from 飞书多维表格 import build_frame, iter_record_pages, parse_bitable_url
 
 # 整体功能实现：从飞书提取文档-清洗后输出excel，按八大区分布
 
-# 飞书 API 配置
-APP_ID = "cli_a72e948d61d2900e"
-APP_SECRET = "DiWuiC8pF7SjZOknpehdvgXWZBmUMann"
-ACCESS_TOKEN_URL = "https://open.feishu.cn/open-apis/auth/v3/tenant_access_token/internal"
+# 定义需要保留的列
+columns_to_keep = ["大区", "城市", "纵队", "类别", "执行季度", "执行月", "日期", "客户人数", "预计产出订单金额"]
 
 
 def get_desktop_path():
@@ -20,80 +18,23 @@ def get_desktop_path():
 
 
 def get_access_token():
-    """获取访问令牌"""
-    payload = {"app_id": APP_ID, "app_secret": APP_SECRET}
-    try:
-        response = requests.post(ACCESS_TOKEN_URL, json=payload, timeout=10)
-        response.raise_for_status()
-        return response.json().get("tenant_access_token")
-    except Exception as e:
-        print(f"❌ 获取Token失败: {str(e)}")
-        return None
-
-
-def parse_document_url(document_url):
-    """解析多维表格URL"""
-    pattern = r"/base/([a-zA-Z0-9_]+).*table=([a-zA-Z0-9_]+)"
-    match = re.search(pattern, document_url)
-    if not match:
-        return None, None
-    return match.group(1), match.group(2)
-
-
-def get_app_name(access_token, base_token):
-    """获取多维表格应用名称"""
-    url = f"https://open.feishu.cn/open-apis/bitable/v1/apps/{base_token}"
-    headers = {"Authorization": f"Bearer {access_token}"}
-    try:
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-        return response.json().get("data", {}).get("name", "未知文档")
-    except Exception as e:
-        print(f"⚠️ 获取文档名称失败: {str(e)}")
-        return "飞书文档"
-
-
-def get_table_data(access_token, base_token, table_id):
-    """获取完整表格数据（自动分页）"""
-    headers = {"Authorization": f"Bearer {access_token}"}
-    url = f"https://open.feishu.cn/open-apis/bitable/v1/apps/{base_token}/tables/{table_id}/records"
-
-    all_records = []
-    page_token = ""
-    while True:
-        params = {"page_size": 100}
-        if page_token:
-            params["page_token"] = page_token
-
-        try:
-            response = requests.get(url, headers=headers, params=params, timeout=15)
-            response.raise_for_status()
-            data = response.json()
-
-            if data.get("code") != 0:
-                print(f"❌ API返回错误: {data.get('msg')}")
-                return None
-
-            all_records.extend(data.get("data", {}).get("items", []))
-
-            if not data.get("data", {}).get("has_more"):
-                break
-
-            page_token = data.get("data", {}).get("page_token", "")
-        except Exception as e:
-            print(f"❌ 获取数据失败: {str(e)}")
-            return None
-
-    # 打印 API 返回的原始数据
-    if all_records:
-        print("API 返回的原始数据前5行:")
-        for record in all_records[:5]:
-            print(record)
-    else:
+    """获取访问令牌，未到期时直接使用缓存"""
+    return get_tenant_access_token(APP_ID, APP_SECRET)
+
+
+def preview_pages(pages):
+    """原样传递各页记录，并打印 API 返回的原始数据前5行"""
+    empty = True
+    for page in pages:
+        if empty and page:
+            print("API 返回的原始数据前5行:")
+            for record in page[:5]:
+                print(record)
+            empty = False
+        yield page
+    if empty:
         print("❌ 未获取到任何记录。")
 
-    return {"data": {"items": all_records}}
-
 
 def save_to_file(df, save_path, file_name, file_format):
     """保存数据到文件"""
@@ -177,18 +118,9 @@ def save_to_file(df, save_path, file_name, file_format):
 
 
 def process_data(df):
-    """处理数据"""
-    # 统一字段
-    all_fields = set()
-    for record in df.to_dict(orient='records'):
-        all_fields.update(record.keys())
-    new_records = []
-    for record in df.to_dict(orient='records'):
-        new_record = {}
-        for field in all_fields:
-            new_record[field] = record.get(field)
-        new_records.append(new_record)
-    df = pd.DataFrame(new_records)
+    """处理一页数据，各页处理完合并后再统一排序"""
+    # 先筛掉不需要的列，后续只处理保留的列
+    df = df.filter(items=columns_to_keep)
 
     # 处理日期格式
     if "日期" in df.columns:
@@ -207,15 +139,6 @@ def process_data(df):
 
     if "纵队" in df.columns:
         df["纵队"] = df["纵队"].apply(extract_text)
-
-    # 定义需要保留的列
-    columns_to_keep = ["大区", "城市", "纵队", "类别", "执行季度", "执行月", "日期", "客户人数", "预计产出订单金额"]
-
-    # 过滤数据框，只保留指定的列
-    df = df.filter(items=columns_to_keep)
-
-    # 按日期列升序排列
-    df = df.sort_values(by="日期")
     return df
 
 
@@ -225,7 +148,7 @@ def get_user_input():
     if not document_url:
         print("❌ URL不能为空，请重新输入。")
         return None, None
-    base_token, table_id = parse_document_url(document_url)
+    base_token, table_id = parse_bitable_url(document_url)
     if not all([base_token, table_id]):
         print("❌ URL格式错误，请确认包含/base/和table参数。")
         return None, None
@@ -258,20 +181,20 @@ def main():
         today = datetime.now().strftime("%Y年%m月%d日")
         file_name = f"智慧中国行{today}数据"
 
-        # 获取表格数据
+        # 获取表格数据，每收到一页就清洗一页
         print("⏳ 正在获取表格数据...")
-        content = get_table_data(access_token, base_token, table_id)
-        if not content:
-            print("❌ 获取表格数据失败，请检查网络连接或API权限。")
+        try:
+            df = build_frame(preview_pages(iter_record_pages(access_token, base_token, table_id)), process_data)
+        except Exception as e:
+            print(f"❌ 获取表格数据失败，请检查网络连接或API权限: {str(e)}")
             return
-
-        # 处理数据
-        records = content["data"]["items"]
-        if not records:
+        if df.empty:
             print("❌ 未获取到有效数据。")
             return
-        df = pd.DataFrame([record["fields"] for record in records])
-        df = process_data(df)
+
+        # 各页合并后列顺序可能不同，统一为保留列的顺序，再按日期列升序排列
+        df = df.filter(items=columns_to_keep)
+        df = df.sort_values(by="日期")
 
         # 打印处理后的数据
         print("处理后的数据前5行:")
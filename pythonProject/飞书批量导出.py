@@ -0,0 +1,166 @@
+import argparse
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import pandas as pd
+from 飞书客户端 import APP_ID, APP_SECRET, get_tenant_access_token, make_rate_limiter, make_token_provider
+from 飞书多维表格 import (build_frame, get_app_name, get_field_names, iter_record_pages, list_tables,
+                          parse_bitable_url, write_records_csv)
+
+# 整体功能实现：一次导出多维表格应用中的全部数据表，或多个URL指定的数据表；
+# 各数据表在线程池中并发导出，同一应用的请求共用一个限频器，每个数据表输出一个文件，最后输出导出汇总
+
+# 多维表格接口按应用限频，同一应用每秒请求数上限
+app_rate_limit = 10
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="并发导出飞书多维表格中的数据表")
+    parser.add_argument('urls', nargs='*', help="多维表格URL；带 table 参数时只导出该数据表，否则导出应用中的全部数据表")
+    parser.add_argument('-l', '--url-list', help="URL 列表文件，每行一个")
+    parser.add_argument('-o', '--output-dir', default=os.path.join(os.path.expanduser("~"), "Desktop", "飞书导出"), help="输出目录，默认为桌面上的“飞书导出”文件夹")
+    parser.add_argument('-f', '--format', choices=['csv', 'xlsx'], default='csv', help="导出格式，默认 csv（边获取边写入）")
+    parser.add_argument('-w', '--workers', type=int, default=4, help="同时导出的数据表数，默认 4")
+    parser.add_argument('-r', '--rate', type=float, default=app_rate_limit, help=f"同一应用每秒请求数上限，默认 {app_rate_limit}")
+    parser.add_argument('--all-tables', action='store_true', help="URL 带 table 参数时也导出所在应用的全部数据表")
+    return parser.parse_args()
+
+
+def collect_tables(access_token, urls, all_tables, rate):
+    """
+    解析 URL 并展开为待导出的数据表，同一数据表只导出一次
+    :param rate: 同一应用每秒请求数上限
+    :return: ([(base_token, 应用名称, table_id, 数据表名称)], {base_token: 限频函数})
+    """
+    # {base_token: [table_id]}，为 None 时导出应用中的全部数据表
+    requested = {}
+    for url in urls:
+        base_token, table_id = parse_bitable_url(url)
+        if not base_token:
+            print(f"❌ URL格式错误，已跳过：{url}")
+            continue
+        if all_tables or not table_id:
+            requested[base_token] = None
+        elif requested.get(base_token, []) is not None:
+            requested.setdefault(base_token, []).append(table_id)
+
+    jobs = []
+    limiters = {}
+    for base_token, table_ids in requested.items():
+        throttle = limiters[base_token] = make_rate_limiter(rate)
+        try:
+            app_name = get_app_name(access_token, base_token, throttle)
+        except Exception as e:
+            print(f"⚠️ 获取应用 {base_token} 的名称失败: {str(e)}")
+            app_name = base_token
+        try:
+            tables = list_tables(access_token, base_token, throttle)
+        except Exception as e:
+            print(f"❌ 获取应用 {app_name} 的数据表列表失败: {str(e)}")
+            continue
+        table_names = dict(tables)
+        if table_ids is None:
+            table_ids = [table_id for table_id, _ in tables]
+        for table_id in dict.fromkeys(table_ids):
+            jobs.append((base_token, app_name, table_id, table_names.get(table_id, table_id)))
+    return jobs, limiters
+
+
+def get_output_files(jobs, output_dir, file_format):
+    """
+    每个数据表一个输出文件，以“应用名称_数据表名称”命名，不能用于文件名的字符替换为下划线；
+    重名时依次加序号，直到与已分配的文件名都不相同（不区分大小写）
+    """
+    output_files = []
+    used = set()
+    for _, app_name, _, table_name in jobs:
+        base_name = re.sub(r'[\\/:*?"<>|]', '_', f"{app_name}_{table_name}")
+        name = base_name
+        suffix = 1
+        while name.casefold() in used:
+            suffix += 1
+            name = f"{base_name}_{suffix}"
+        used.add(name.casefold())
+        output_files.append(os.path.join(output_dir, f"{name}.{file_format}"))
+    return output_files
+
+
+def export_table(access_token, base_token, table_id, output_file, file_format, throttle):
+    """
+    在线程中导出一个数据表，出错时记录原因而不中断其他数据表
+    :param access_token: 取令牌的函数，每次请求都取当前令牌，长时间导出中途到期时会自动换新
+    :return: 该数据表的导出结果
+    """
+    start = time.perf_counter()
+    result = {'应用': base_token, '数据表': table_id, '状态': '成功', '行数': 0, '输出文件': output_file, '说明': ''}
+    try:
+        pages = iter_record_pages(access_token, base_token, table_id, throttle=throttle)
+        if file_format == 'csv':
+            columns = get_field_names(access_token, base_token, table_id, throttle)
+            result['行数'] = write_records_csv(pages, output_file, columns)
+        else:
+            df = build_frame(pages)
+            df.to_excel(output_file, index=False)
+            result['行数'] = len(df)
+    except Exception as e:
+        # 不保留写了一半的文件
+        if os.path.exists(output_file):
+            os.remove(output_file)
+        result['状态'] = '失败'
+        result['输出文件'] = ''
+        result['说明'] = str(e)
+    result['耗时（秒）'] = round(time.perf_counter() - start, 2)
+    return result
+
+
+def main():
+    args = parse_args()
+    urls = list(args.urls)
+    if args.url_list:
+        with open(args.url_list, 'r', encoding='utf-8') as f:
+            urls += [line.strip() for line in f if line.strip()]
+    if not urls:
+        print("❌ 没有需要导出的多维表格URL，请检查输入。")
+        exit(1)
+
+    if not get_tenant_access_token(APP_ID, APP_SECRET):
+        print("❌ 无法获取访问令牌，请检查APP_ID和APP_SECRET是否正确。")
+        exit(1)
+    access_token = make_token_provider(APP_ID, APP_SECRET)
+
+    start = time.perf_counter()
+    jobs, limiters = collect_tables(access_token, urls, args.all_tables, args.rate)
+    if not jobs:
+        print("❌ 没有可导出的数据表。")
+        exit(1)
+    os.makedirs(args.output_dir, exist_ok=True)
+    output_files = get_output_files(jobs, args.output_dir, args.format)
+    workers = max(1, min(args.workers, len(jobs)))
+    print(f"⏳ 共 {len(jobs)} 个数据表，{workers} 个并发导出...")
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(export_table, access_token, base_token, table_id, output_file, args.format,
+                                   limiters[base_token])
+                   for (base_token, _, table_id, _), output_file in zip(jobs, output_files)]
+        results = []
+        # 按输入顺序输出进度
+        for i, ((_, app_name, _, table_name), future) in enumerate(zip(jobs, futures), start=1):
+            result = future.result()
+            result['应用'], result['数据表'] = app_name, table_name
+            results.append(result)
+            if result['状态'] == '成功':
+                print(f"[{i}/{len(jobs)}] ✅ {app_name} / {table_name}：{result['行数']} 行（{result['耗时（秒）']} 秒）")
+            else:
+                print(f"[{i}/{len(jobs)}] ❌ {app_name} / {table_name}：{result['说明']}")
+
+    summary_file = os.path.join(args.output_dir, f"导出汇总{datetime.now().strftime('%Y%m%d%H%M')}.csv")
+    pd.DataFrame(results).to_csv(summary_file, index=False, encoding='utf-8-sig')
+    succeeded = sum(result['状态'] == '成功' for result in results)
+    print(f"共 {len(results)} 个数据表，成功 {succeeded} 个，失败 {len(results) - succeeded} 个，"
+          f"总耗时 {time.perf_counter() - start:.2f} 秒，汇总已保存至 {summary_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+import os
+import random
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from 区域匹配 import (city_to_province, classify_regions, extract_regions, extract_regions_from_a,  # noqa: E402
+                     match_region, region_mapping)
+
+
+# 以下为改用自动机之前的逐条扫描实现，作为比对基准
+def old_match_region(area):
+    province = next((p for city, p in city_to_province.items() if city in area), None)
+    if province:
+        return next((k for k, v in region_mapping.items() if province in v["覆盖"]), '')
+    return next((k for k, v in region_mapping.items() if any(p in area for p in v["覆盖"])), '')
+
+
+def old_extract_region(text):
+    if isinstance(text, str):
+        text = text.replace("丨", " | ").replace("｜", " | ")
+        parts = text.split("|")
+        if len(parts) > 1:
+            return parts[-1].strip()
+    return ''
+
+
+def old_extract_region_from_a(text):
+    if isinstance(text, str):
+        text = text.replace("丨", " | ").replace("｜", " | ")
+        parts = text.split("|")
+        if len(parts) > 1:
+            for region in region_mapping.keys():
+                if region in parts[0]:
+                    return region
+    return ''
+
+
+def test_overlapping_names_match_old_scan():
+    areas = [
+        "海南藏族自治州",  # 青海的城市，包含省份名“海南”
+        "吉林",  # 既是城市也是省份
+        "喀什地区",  # 城市“喀什”与“喀什地区”重叠
+        "内蒙古包头",
+        "广州市",
+        "上海浦东",
+        "黄山脚下的黄南藏族自治州",
+        "某地",
+        "",
+    ]
+    for area in areas:
+        assert match_region(area) == old_match_region(area), area
+
+
+def test_first_match_follows_mapping_order_not_text_position():
+    # 两个城市同时出现时，取映射表中靠前的城市，而不是文本中先出现的
+    assert match_region("北京到杭州") == old_match_region("北京到杭州") == "东南大区"
+    # 没有城市时按大区顺序匹配省份
+    assert match_region("四川和浙江") == old_match_region("四川和浙江") == "东南大区"
+
+
+def test_random_combinations_match_old_scan():
+    rng = random.Random(0)
+    names = list(city_to_province) + [p for info in region_mapping.values() for p in info["覆盖"]]
+    fillers = ["", "市", "区", "大区", "|", "和", "x"]
+    areas = ["".join(rng.choice(names) + rng.choice(fillers) for _ in range(rng.randint(1, 3)))
+             for _ in range(2000)]
+    expected = [old_match_region(area) for area in areas]
+    assert classify_regions(pd.Series(areas)).tolist() == expected
+
+
+def test_missing_and_empty_sources():
+    sources = pd.Series([np.nan, None, "", "智慧中国行", "智慧中国行｜杭州", "华东大区创新之旅丨 苏州 ", 12, "智慧中国行｜"],
+                        dtype=object)
+    regions = extract_regions(sources)
+    assert regions.tolist() == [old_extract_region(s) for s in sources]
+    assert classify_regions(regions).tolist() == [old_match_region(r) for r in regions]
+    assert extract_regions_from_a(sources).tolist() == [old_extract_region_from_a(s) for s in sources]
+    # 地区列中的缺失值与非文本取值匹配为空串
+    assert classify_regions(pd.Series([np.nan, None, 3, "杭州"], dtype=object)).tolist() == ['', '', '', "东南大区"]
+    assert classify_regions(pd.Series([], dtype=object)).tolist() == []
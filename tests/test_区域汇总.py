@@ -0,0 +1,78 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from 区域汇总 import build_rollup_cube, diff_column, mean_columns, slice_level, sum_columns  # noqa: E402
+
+
+def make_detail(rows=600, seed=0):
+    rng = np.random.default_rng(seed)
+    regions = {'苏州': '华东大区', '上海': '华东大区', '杭州': '东南大区', '厦门': '东南大区', '成都': '西部大区'}
+    cities = rng.choice(list(regions) + [None], rows)
+    df = pd.DataFrame({
+        '地区': cities,
+        '大区': [regions.get(city, '西部大区') for city in cities],
+    })
+    # 部分行没有大区，只计入全国
+    df.loc[rng.random(rows) < 0.05, '大区'] = None
+    for col in sum_columns + [diff_column]:
+        df[col] = np.round(rng.normal(size=rows) * 10, 2)
+    for col in mean_columns:
+        values = rng.random(rows)
+        values[rng.random(rows) < 0.3] = np.nan
+        df[col] = values
+    # 成都的订单达成率全部为空，均值应为空而不是 0
+    df.loc[df['地区'] == '成都', '订单达成率'] = np.nan
+    return df
+
+
+def expected_level(df, keys):
+    """直接按层级对明细分组求和、求均值"""
+    grouped = df.groupby(keys) if keys else df.groupby(lambda _: 0)
+    expected = pd.concat([grouped[sum_columns].sum(), grouped[mean_columns].mean()], axis=1)
+    expected['站点数量'] = grouped.size()
+    expected['单站产出'] = (expected['订单 $M'] / expected['站点数量']).round(2)
+    expected[diff_column + '总和'] = grouped[diff_column].sum()
+    expected['较上周单站产出'] = (expected[diff_column + '总和'] / expected['站点数量']).round(2)
+    return expected.reset_index(drop=not keys)
+
+
+def test_each_level_matches_direct_groupby():
+    df = make_detail()
+    cube = build_rollup_cube(df)
+    for level, keys in (('地区', ['地区', '大区']), ('大区', ['大区']), ('全国', [])):
+        result = slice_level(cube, level)
+        expected = expected_level(df, keys)
+        if keys:
+            result = result.sort_values(keys).reset_index(drop=True)
+            expected = expected.sort_values(keys).reset_index(drop=True)
+        pd.testing.assert_frame_equal(result[expected.columns], expected, check_dtype=False, rtol=1e-9)
+
+    # 全部为空的均值保持为空，不按 0 计入
+    region_rows = slice_level(cube, '地区')
+    assert region_rows.loc[region_rows['地区'] == '成都', '订单达成率'].isna().all()
+    assert slice_level(cube, '全国')['站点数量'].iloc[0] == len(df)
+
+
+def test_mean_columns_ignore_missing_and_text_values():
+    df = pd.DataFrame({
+        '地区': ['苏州', '苏州', '苏州', '上海', '上海'],
+        '大区': ['华东大区'] * 5,
+        'SQL $M': [1.0, '2', None, 'x', 4.0],
+        '订单 $M': [1.0, 1.0, 1.0, 2.0, 2.0],
+        'SQL达成率': [0.2, np.nan, 0.5, '0.4', '无'],
+    })
+    cube = build_rollup_cube(df)
+    region = slice_level(cube, '地区').set_index('地区')
+    assert region.loc['苏州', 'SQL $M'] == 3.0
+    assert region.loc['上海', 'SQL $M'] == 4.0
+    assert region.loc['苏州', 'SQL达成率'] == pytest.approx(0.35)
+    assert region.loc['上海', 'SQL达成率'] == 0.4
+    # 大区的均值按明细中的非空值计算（0.3667），而不是地区均值的平均（0.375）
+    assert slice_level(cube, '大区')['SQL达成率'].iloc[0] == pytest.approx((0.2 + 0.5 + 0.4) / 3)
+    assert list(slice_level(cube, '全国').columns) == ['SQL $M', '订单 $M', 'SQL达成率', '站点数量', '单站产出']
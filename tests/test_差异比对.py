@@ -0,0 +1,47 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from 差异比对 import diff_weeks, hash_keys, normalize_key  # noqa: E402
+
+key_columns = ["线索3级来源", "cdbid"]
+value_columns = ["订单 $M"]
+
+
+def make_week(cdbids, orders):
+    return pd.DataFrame({
+        "线索3级来源": [f"来源{i}" for i in range(len(cdbids))],
+        "cdbid": cdbids,
+        "订单 $M": orders,
+    })
+
+
+def test_int_and_object_keys_hash_the_same():
+    last_week = make_week(pd.Series([1, 2, 3], dtype="int64"), [1.0, 2.0, 3.0])
+    this_week = make_week(pd.Series([1, "2", 3.0], dtype=object), [1.0, 2.5, 3.0])
+    assert (hash_keys(last_week, key_columns) == hash_keys(this_week, key_columns)).all()
+
+    result = diff_weeks(last_week, this_week, key_columns, value_columns)
+    assert not result["is_new"].any()
+    assert result["removed"].empty
+    assert result["changed"]["cdbid"].tolist() == ["2"]
+    assert result["changed"]["订单 $M 差额"].tolist() == [0.5]
+
+
+def test_large_nullable_ids_keep_precision():
+    ids = [2**53 + 1, 2**53 + 2]
+    keys = normalize_key(pd.Series(ids, dtype="Int64"))
+    assert keys.tolist() == [str(i) for i in ids]
+    assert keys.tolist() == normalize_key(pd.Series(ids, dtype=object)).tolist()
+
+
+def test_missing_keys_share_one_sentinel():
+    float_keys = normalize_key(pd.Series([np.nan, 1.0]))
+    object_keys = normalize_key(pd.Series([None, 1], dtype=object))
+    nullable_keys = normalize_key(pd.Series([None, 1], dtype="Int64"))
+    assert float_keys.tolist() == object_keys.tolist() == nullable_keys.tolist()
+    assert float_keys[1] == "1"
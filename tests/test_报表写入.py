@@ -0,0 +1,61 @@
+import os
+import sys
+import zipfile
+
+import pandas as pd
+from openpyxl import Workbook, load_workbook
+from openpyxl.styles import Font
+from openpyxl.workbook.defined_name import DefinedName
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from 报表写入 import detail_layout, insert_sheets  # noqa: E402
+
+
+def make_source(path):
+    wb = Workbook()
+    first = wb.active
+    first.title = '第一表'
+    first.append(['a', 'b'])
+    first.append([1, '=A2*2'])
+    first['A2'].font = Font(bold=True, color='FF0000')
+    first['A2'].number_format = '0.000'
+    second = wb.create_sheet('第二表')
+    second.append(['x'])
+    second.print_area = 'A1:A1'
+    wb.defined_names['全局'] = DefinedName('全局', attr_text="'第一表'!$A$1")
+    wb.active = 1
+    wb.save(path)
+
+
+def test_original_sheets_are_copied_and_new_sheets_follow_them(tmp_path):
+    source_file = str(tmp_path / '源.xlsx')
+    output_file = str(tmp_path / '输出.xlsx')
+    make_source(source_file)
+    detail = pd.DataFrame({'大区': ['华东大区', '汇总'], 'SQL $M': [1.234, None], 'SQL达成率': [0.5, 0.25]})
+    insert_sheets(source_file, output_file, [
+        ('第一表', '第一表-区域详情', detail, detail_layout),
+        ('第二表', '第一表-区域详情', detail, detail_layout),
+    ])
+
+    # 原工作表的 XML 部件逐字节不变
+    with zipfile.ZipFile(source_file) as source, zipfile.ZipFile(output_file) as output:
+        for name in ('xl/worksheets/sheet1.xml', 'xl/worksheets/sheet2.xml'):
+            assert output.read(name) == source.read(name)
+
+    wb = load_workbook(output_file)
+    # 重名的工作表加序号；工作表级定义名称和当前工作表随位置后移
+    assert wb.sheetnames == ['第一表', '第一表-区域详情', '第二表', '第一表-区域详情1']
+    assert wb.active.title == '第二表'
+    assert wb['第二表'].print_area == "'第二表'!$A$1"
+    assert wb['第一表']['B2'].value == '=A2*2'
+    assert wb['第一表']['A2'].font.b and wb['第一表']['A2'].number_format == '0.000'
+
+    new_sheet = wb['第一表-区域详情']
+    assert [cell.value for cell in new_sheet[1]] == ['大区', 'SQL $M', 'SQL达成率']
+    assert new_sheet['B2'].value == 1.234 and new_sheet['B2'].number_format == '0.00'
+    assert new_sheet['C3'].number_format == '0.00%'
+    assert new_sheet['B3'].value is None and new_sheet['B3'].border.left.style == 'thin'
+    assert new_sheet['A1'].font.b and new_sheet['A1'].font.name == '微软雅黑'
+    assert new_sheet.row_dimensions[1].height == detail_layout['header_height']
+    assert not new_sheet.sheet_view.tabSelected
@@ -0,0 +1,70 @@
+import io
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook, load_workbook
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from 数据分析1_Grip import round_and_summarize, round_column  # noqa: E402
+
+
+def old_round_cells(values, digits, threshold):
+    """原流程：数值写入 Excel 后读回，再逐个单元格 round，过小的值置空"""
+    wb = Workbook()
+    ws = wb.active
+    for value in values:
+        ws.append([value])
+    buffer = io.BytesIO()
+    wb.save(buffer)
+    buffer.seek(0)
+    ws = load_workbook(buffer).active
+    result = []
+    for (value,) in ws.iter_rows(values_only=True):
+        result.append(round(value, digits) if abs(value) >= threshold else None)
+    return pd.Series(result, dtype=float)
+
+
+def test_ties_round_like_saved_cells():
+    # 原始浮点数在 .5 附近，按 %.16g 保存后正好是 .5 或稍大的十进制数
+    values = pd.Series([-0.12500000000000003, 0.885, 0.815, -0.7050000000000001, -1.165, -1.055, 2.675, 0.0049999999999999])
+    expected = old_round_cells(values, 2, 0.01)
+    assert expected.iloc[0] == -0.12
+    pd.testing.assert_series_equal(round_column(values, 2, 0.01), expected)
+
+
+def test_three_decimal_differences_match_old_cells():
+    rng = np.random.default_rng(0)
+    values = pd.Series(np.round(rng.random(5000) * 3, 3) - np.round(rng.random(5000) * 3, 3))
+    pd.testing.assert_series_equal(round_column(values, 2, 0.01), old_round_cells(values, 2, 0.01))
+    pd.testing.assert_series_equal(round_column(values, 3, 0.001), old_round_cells(values, 3, 0.001))
+
+
+def test_missing_values_and_frames():
+    frame = pd.DataFrame({'a': [0.125, np.nan, 0.004], 'b': [-0.125, 1.0, np.nan]})
+    rounded = round_column(frame, 2, 0.01)
+    assert rounded.columns.tolist() == ['a', 'b']
+    assert rounded['a'].tolist()[0] == 0.12
+    assert rounded['a'].isna().tolist() == [False, True, True]
+    assert rounded['b'].tolist()[:2] == [-0.12, 1.0]
+
+
+def test_summary_row_sums_rounded_cells():
+    merged_df = pd.DataFrame({
+        '线索3级来源': ['a', 'b', 'c'],
+        'SQL $M': [0.0035, 0.0045, 0.0026],
+        '商机 $M': [1.0, 2.0, 3.0],
+        '订单 $M': [0.0, 0.0, 0.0],
+        'SQL $M 差额': [0.005, 0.005, 0.005],
+        '商机 $M 差额': [0.0, 0.0, 0.0],
+        '订单 $M 差额': [-0.12500000000000003, 0.0, 0.0],
+    })
+    result = round_and_summarize(merged_df)
+    summary = result.iloc[-1]
+    assert summary['线索3级来源'] == '汇总'
+    # 原流程按取整后的单元格依次累加，再对合计 round
+    cells = [round(value, 3) for value in [0.0035, 0.0045, 0.0026]]
+    assert summary['SQL $M'] == round(cells[0] + cells[1] + cells[2], 2)
+    assert summary['订单 $M 差额'] == -0.12
@@ -0,0 +1,68 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import 目标表  # noqa: E402
+from 目标表 import compile_targets, fill_targets, get_cache_path, load_targets  # noqa: E402
+
+
+def make_report():
+    return pd.DataFrame({
+        '线索3级来源': ['活动｜苏州', '其他｜苏州', '活动｜上海', '活动｜杭州'],
+        '地区': [' 苏州 ', '苏州', '上海', '杭州'],
+        '大区': ['华东大区', '华东大区', '华东大区', '东南大区'],
+        'SQL目标': [np.nan, np.nan, np.nan, 3.0],
+    })
+
+
+def test_specific_levels_override_broad_ones():
+    targets = pd.DataFrame({
+        '线索3级来源': [None, None, '活动｜苏州', None],
+        '地区': [None, '苏州', '苏州', None],
+        '大区': ['华东大区', '华东大区', None, None],
+        'SQL目标': [10, 20, None, 99],
+        '订单目标': [5, None, 7, 99],
+    })
+    df = fill_targets(make_report(), compile_targets(targets))
+    # 地区覆盖大区；线索3级来源只填了订单目标，SQL目标保留地区的值
+    assert df['SQL目标'].tolist()[:3] == [20, 20, 10]
+    # 地区的订单目标为空时不覆盖大区的值
+    assert df['订单目标'].tolist()[:3] == [7, 5, 5]
+    # 没有匹配到的行保持原值，没有匹配列的目标行不参与
+    assert df['SQL目标'].iloc[3] == 3
+    assert np.isnan(df['订单目标'].iloc[3])
+
+
+def test_row_with_several_levels_counts_as_most_specific():
+    targets = pd.DataFrame({'地区': ['苏州'], '大区': ['华东大区'], 'SQL目标': [20]})
+    df = fill_targets(make_report(), compile_targets(targets))
+    # 该行只作为地区目标，不会把同大区的上海也填上
+    assert df['SQL目标'].tolist()[:2] == [20, 20]
+    assert np.isnan(df['SQL目标'].iloc[2])
+
+
+def test_changed_target_file_invalidates_cache(tmp_path, monkeypatch):
+    target_file = str(tmp_path / '目标.csv')
+    pd.DataFrame({'大区': ['华东大区'], 'SQL目标': [10]}).to_csv(target_file, index=False, encoding='utf-8-sig')
+    monkeypatch.setattr(目标表, 'loaded_targets', {})
+    assert fill_targets(make_report(), load_targets(target_file))['SQL目标'].iloc[0] == 10
+    assert os.path.exists(get_cache_path(target_file))
+
+    # 文件未改动时直接读取缓存，不再解析目标表
+    monkeypatch.setattr(目标表, 'loaded_targets', {})
+    with monkeypatch.context() as m:
+        m.setattr(目标表, 'read_target_file', lambda path: (_ for _ in ()).throw(AssertionError("不应重新读取")))
+        assert fill_targets(make_report(), load_targets(target_file))['SQL目标'].iloc[0] == 10
+
+    # 改动后重新编译；文件大小不变时按修改时间判断
+    size = os.path.getsize(target_file)
+    pd.DataFrame({'大区': ['华东大区'], 'SQL目标': [12]}).to_csv(target_file, index=False, encoding='utf-8-sig')
+    stat = os.stat(target_file)
+    assert stat.st_size == size
+    os.utime(target_file, (stat.st_atime, stat.st_mtime + 10))
+    monkeypatch.setattr(目标表, 'loaded_targets', {})
+    assert fill_targets(make_report(), load_targets(target_file))['SQL目标'].iloc[0] == 12
@@ -0,0 +1,206 @@
+import numpy as np
+import pandas as pd
+
+# 整体功能实现：将城市、省份和大区映射表一次性编译为多模式匹配自动机，整列批量匹配大区
+
+# 优化后的区域映射表（基于行政划分）
+region_mapping = {
+    "东南大区": {"覆盖": ["浙江", "江西", "福建"]},
+    "华东大区": {"覆盖": ["上海", "江苏", "安徽"]},
+    "华北大区": {"覆盖": ["北京", "天津", "河北", "山西", "内蒙古"]},
+    "华南大区": {"覆盖": ["广东", "广西", "海南"]},
+    "西南大区": {"覆盖": ["四川", "重庆", "云南", "贵州", "西藏"]},
+    "西北大区": {"覆盖": ["陕西", "甘肃", "宁夏", "青海", "新疆"]},
+    "中东大区": {"覆盖": ["山东", "河南", "湖北", "湖南"]},
+    "东北大区": {"覆盖": ["黑龙江", "吉林", "辽宁"]}
+}
+
+# 使用标准城市-省份映射（完整数据）
+city_to_province = {
+    **{city: "浙江" for city in ["杭州", "宁波", "温州", "嘉兴", "湖州", "绍兴", "金华", "衢州", "舟山", "台州", "丽水"]},
+    **{city: "江苏" for city in ["南京", "苏州", "无锡", "常州", "徐州", "南通", "连云港", "淮安", "盐城", "扬州", "镇江", "泰州", "宿迁"]},
+    **{city: "安徽" for city in ["合肥", "芜湖", "蚌埠", "淮南", "马鞍山", "淮北", "铜陵", "安庆", "黄山", "阜阳", "宿州", "滁州", "六安", "宣城", "池州", "亳州"]},
+    **{city: "江西" for city in ["南昌", "九江", "景德镇", "萍乡", "新余", "鹰潭", "赣州", "吉安", "宜春", "抚州", "上饶"]},
+    **{city: "福建" for city in ["福州", "厦门", "莆田", "三明", "泉州", "漳州", "南平", "龙岩", "宁德"]},
+    **{city: "上海" for city in ["上海"]},
+    **{city: "北京" for city in ["北京"]},
+    **{city: "天津" for city in ["天津"]},
+    **{city: "河北" for city in ["石家庄", "唐山", "秦皇岛", "邯郸", "邢台", "保定", "张家口", "承德", "沧州", "廊坊", "衡水"]},
+    **{city: "山西" for city in ["太原", "大同", "阳泉", "长治", "晋城", "朔州", "晋中", "运城", "忻州", "临汾", "吕梁"]},
+    **{city: "内蒙古" for city in ["呼和浩特", "包头", "乌海", "赤峰", "通辽", "鄂尔多斯", "呼伦贝尔", "巴彦淖尔", "乌兰察布", "兴安盟", "锡林郭勒盟", "阿拉善盟"]},
+    **{city: "广东" for city in ["广州", "深圳", "珠海", "汕头", "佛山", "韶关", "湛江", "肇庆", "江门", "茂名", "惠州", "梅州", "汕尾", "河源", "阳江", "清远", "东莞", "中山", "潮州", "揭阳", "云浮"]},
+    **{city: "广西" for city in ["南宁", "柳州", "桂林", "梧州", "北海", "防城港", "钦州", "贵港", "玉林", "百色", "贺州", "河池", "来宾", "崇左"]},
+    **{city: "海南" for city in ["海口", "三亚", "三沙", "儋州"]},
+    **{city: "四川" for city in ["成都", "自贡", "攀枝花", "泸州", "德阳", "绵阳", "广元", "遂宁", "内江", "乐山", "南充", "眉山", "宜宾", "广安", "达州", "雅安", "巴中", "资阳", "阿坝藏族羌族自治州", "甘孜藏族自治州", "凉山彝族自治州"]},
+    **{city: "重庆" for city in ["重庆"]},
+    **{city: "云南" for city in ["昆明", "曲靖", "玉溪", "保山", "昭通", "丽江", "普洱", "临沧", "楚雄彝族自治州", "红河哈尼族彝族自治州", "文山壮族苗族自治州", "西双版纳傣族自治州", "大理白族自治州", "德宏傣族景颇族自治州", "怒江傈僳族自治州", "迪庆藏族自治州"]},
+    **{city: "贵州" for city in ["贵阳", "六盘水", "遵义", "安顺", "毕节", "铜仁", "黔西南布依族苗族自治州", "黔东南苗族侗族自治州", "黔南布依族苗族自治州"]},
+    **{city: "西藏" for city in ["拉萨", "日喀则", "昌都", "林芝", "山南", "那曲", "阿里地区"]},
+    **{city: "陕西" for city in ["西安", "铜川", "宝鸡", "咸阳", "渭南", "延安", "汉中", "榆林", "安康", "商洛"]},
+    **{city: "甘肃" for city in ["兰州", "嘉峪关", "金昌", "白银", "天水", "武威", "张掖", "平凉", "酒泉", "庆阳", "定西", "陇南", "临夏回族自治州", "甘南藏族自治州"]},
+    **{city: "宁夏" for city in ["银川", "石嘴山", "吴忠", "固原", "中卫"]},
+    **{city: "青海" for city in ["西宁", "海东", "海北藏族自治州", "黄南藏族自治州", "海南藏族自治州", "果洛藏族自治州", "玉树藏族自治州", "海西蒙古族藏族自治州"]},
+    **{city: "新疆" for city in ["乌鲁木齐", "克拉玛依", "吐鲁番", "哈密", "昌吉回族自治州", "博尔塔拉蒙古自治州", "巴音郭楞蒙古自治州", "阿克苏地区", "克孜勒苏柯尔克孜自治州", "喀什", "喀什地区", "和田地区", "伊犁哈萨克自治州", "塔城地区", "阿勒泰地区"]},
+    **{city: "山东" for city in ["济南", "青岛", "淄博", "枣庄", "东营", "烟台", "潍坊", "济宁", "泰安", "威海", "日照", "临沂", "德州", "聊城", "滨州", "菏泽"]},
+    **{city: "河南" for city in ["郑州", "开封", "洛阳", "平顶山", "安阳", "鹤壁", "新乡", "焦作", "濮阳", "许昌", "漯河", "三门峡", "南阳", "商丘", "信阳", "周口", "驻马店"]},
+    **{city: "湖北" for city in ["武汉", "黄石", "十堰", "宜昌", "襄阳", "鄂州", "荆门", "孝感", "荆州", "黄冈", "咸宁", "随州", "恩施土家族苗族自治州"]},
+    **{city: "湖南" for city in ["长沙", "株洲", "湘潭", "衡阳", "邵阳", "岳阳", "常德", "张家界", "益阳", "郴州", "永州", "怀化", "娄底", "湘西土家族苗族自治州"]},
+    **{city: "黑龙江" for city in ["哈尔滨", "齐齐哈尔", "鸡西", "鹤岗", "双鸭山", "大庆", "伊春", "佳木斯", "七台河", "牡丹江", "黑河", "绥化", "大兴安岭地区"]},
+    **{city: "吉林" for city in ["长春", "吉林", "四平", "辽源", "通化", "白山", "松原", "白城", "延边朝鲜族自治州"]},
+    **{city: "辽宁" for city in ["沈阳", "大连", "鞍山", "抚顺", "本溪", "丹东", "锦州", "营口", "阜新", "辽阳", "盘锦", "铁岭", "朝阳", "葫芦岛"]}
+}
+
+
+def build_automaton(patterns):
+    """
+    构建 Aho-Corasick 多模式匹配自动机
+    :param patterns: (模式串, 优先级, 标签) 列表，优先级数值越小越优先
+    :return: (goto, fail, output)，output[state] 为该状态可命中的最高优先级 (优先级, 标签)
+    """
+    goto = [{}]
+    output = [None]
+    for pattern, priority, label in patterns:
+        state = 0
+        for char in pattern:
+            if char not in goto[state]:
+                goto.append({})
+                output.append(None)
+                goto[state][char] = len(goto) - 1
+            state = goto[state][char]
+        if output[state] is None or priority < output[state][0]:
+            output[state] = (priority, label)
+
+    # 按广度优先构建失败指针，并沿失败链合并输出，匹配时只需看当前状态
+    fail = [0] * len(goto)
+    queue = list(goto[0].values())
+    for state in queue:
+        for char, next_state in goto[state].items():
+            fallback = fail[state]
+            while fallback and char not in goto[fallback]:
+                fallback = fail[fallback]
+            fail[next_state] = goto[fallback].get(char, 0)
+            inherited = output[fail[next_state]]
+            if inherited is not None and (output[next_state] is None or inherited[0] < output[next_state][0]):
+                output[next_state] = inherited
+            queue.append(next_state)
+    return goto, fail, output
+
+
+def search_automaton(automaton, text):
+    """
+    扫描文本，返回命中的最高优先级标签
+    :param automaton: build_automaton 的返回值
+    :param text: 待匹配文本
+    :return: 命中的 (优先级, 标签)，未命中返回 None
+    """
+    goto, fail, output = automaton
+    best = None
+    state = 0
+    for char in text:
+        while state and char not in goto[state]:
+            state = fail[state]
+        state = goto[state].get(char, 0)
+        hit = output[state]
+        if hit is not None and (best is None or hit[0] < best[0]):
+            best = hit
+    return best
+
+
+def compile_region_patterns(region_mapping, city_to_province):
+    """
+    将城市、省份映射表转换为带优先级的模式列表
+    城市按映射表顺序优先，其次按大区顺序匹配省份，与逐条扫描的结果保持一致
+    """
+    province_to_region = {}
+    for region, info in region_mapping.items():
+        for province in info["覆盖"]:
+            province_to_region.setdefault(province, region)
+
+    patterns = []
+    for priority, (city, province) in enumerate(city_to_province.items()):
+        patterns.append((city, priority, province_to_region.get(province, '')))
+
+    offset = len(patterns)
+    for priority, (region, info) in enumerate(region_mapping.items(), start=offset):
+        for province in info["覆盖"]:
+            patterns.append((province, priority, region))
+    return patterns
+
+
+# 模块加载时编译一次，后续所有匹配共用
+region_automaton = build_automaton(compile_region_patterns(region_mapping, city_to_province))
+
+
+def match_region(area):
+    """根据地区文本匹配大区（城市优先，省份次之）"""
+    if not isinstance(area, str):
+        return ''
+    hit = search_automaton(region_automaton, area)
+    return hit[1] if hit else ''
+
+
+def map_unique(values, func):
+    """
+    先对整列去重，只对去重后的取值计算一次，再按原顺序展开
+    :param values: 待处理 Series
+    :param func: 接收去重后 Series、返回等长结果的函数
+    :return: 与输入索引一致的结果 Series，缺失值对应空串
+    """
+    codes, uniques = pd.factorize(values)
+    # 末尾追加空串，缺失值的编码 -1 正好取到它
+    labels = np.append(np.asarray(func(pd.Series(uniques, dtype=object)), dtype=object), '')
+    return pd.Series(labels[codes], index=values.index, dtype=object)
+
+
+def classify_regions(areas):
+    """
+    整列匹配大区，相同地区只匹配一次
+    :param areas: 地区 Series
+    :return: 与输入索引一致的大区 Series
+    """
+    return map_unique(areas, lambda uniques: [match_region(area) for area in uniques])
+
+
+def split_sources(sources):
+    """
+    将 丨 和 ｜ 统一替换为 | 后按 | 拆分，非文本取值视为缺失
+    :return: (规范化后的文本 Series, 是否包含分隔符的布尔 Series)
+    """
+    sources = sources.where(sources.map(lambda value: isinstance(value, str)), None)
+    normalized = sources.str.replace('[丨｜]', ' | ', regex=True)
+    has_separator = normalized.str.contains('|', regex=False).eq(True)
+    return normalized, has_separator
+
+
+def extract_regions(sources):
+    """
+    整列提取地区：取 线索3级来源 中最后一个分隔符之后的部分
+    :param sources: 线索3级来源 Series
+    :return: 地区 Series，无分隔符或非文本时为空串
+    """
+    def extract(uniques):
+        normalized, has_separator = split_sources(uniques)
+        last_parts = normalized.str.rsplit('|', n=1).str[-1].str.strip()
+        return last_parts.where(has_separator, '')
+
+    return map_unique(sources, extract)
+
+
+def extract_regions_from_a(sources):
+    """
+    整列提取大区（创新之旅）：在第一个分隔符之前的部分中按映射表顺序查找大区名称
+    :param sources: 线索3级来源 Series
+    :return: 大区 Series，未找到时为空串
+    """
+    def extract(uniques):
+        normalized, has_separator = split_sources(uniques)
+        first_parts = normalized.str.split('|', n=1).str[0]
+        result = pd.Series('', index=uniques.index, dtype=object)
+        unmatched = has_separator.copy()
+        for region in region_mapping.keys():
+            hit = unmatched & first_parts.str.contains(region, regex=False).eq(True)
+            result[hit] = region
+            unmatched &= ~hit
+        return result
+
+    return map_unique(sources, extract)
@@ -0,0 +1,83 @@
+import pandas as pd
+
+# 整体功能实现：对明细只做一次分组求和，得到最细层级的部分汇总，再由部分汇总逐级上卷
+# （地区 → 大区 → 全国），各层级的求和、均值、站点数量和单站产出放在同一张整齐的表中
+
+# 上卷层级，从细到粗；最后固定追加“全国”
+rollup_levels = ['地区', '大区']
+sum_columns = ['SQL $M', '订单 $M', '商机 $M', '高价值客户覆盖数']
+mean_columns = ['SQL达成率', '订单转化率', '订单达成率']
+diff_column = '订单 $M 差额'
+national_level = '全国'
+
+
+def build_rollup_cube(df, levels=None):
+    """
+    生成多层级汇总表
+    :param df: 明细数据（已去除汇总行）
+    :param levels: 上卷层级，从细到粗，默认为 rollup_levels；明细中没有的层级跳过
+    :return: 每行一个层级下的一个分组，“层级”列为所在层级，较粗层级中不适用的分组列为空；
+             包含求和列、均值列、站点数量、单站产出，有订单差额时还有差额总和与较上周单站产出
+    """
+    levels = [col for col in levels or rollup_levels if col in df.columns]
+    sums = [col for col in sum_columns if col in df.columns]
+    if diff_column in df.columns:
+        sums.append(diff_column)
+    means = [col for col in mean_columns if col in df.columns]
+
+    # 均值拆成非空值之和与非空个数，上卷时分别合计后再相除；所有度量一次分组求和
+    work = pd.DataFrame({col: df[col] for col in levels}, index=df.index)
+    for col in sums:
+        work[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
+    for col in means:
+        values = pd.to_numeric(df[col], errors='coerce')
+        work[col] = values.fillna(0)
+        work[col + '#个数'] = values.notna().astype(int)
+    work['站点数量'] = 1
+    if levels:
+        partial = work.groupby(levels, dropna=False, sort=False).sum().reset_index()
+    else:
+        partial = work
+
+    measures = [col for col in partial.columns if col not in levels]
+    cube = []
+    for i, level in enumerate(levels + [national_level]):
+        keys = levels[i:]
+        if keys:
+            # 分组键为空的行不进入该层级，与 groupby 默认行为一致
+            level_df = partial[partial[level].notna()].groupby(keys, sort=True)[measures].sum().reset_index()
+        else:
+            level_df = partial[measures].sum().to_frame().T
+        for col in levels[:i]:
+            level_df[col] = None
+        level_df.insert(0, '层级', level)
+        cube.append(level_df)
+    cube = pd.concat(cube, ignore_index=True)
+
+    for col in means:
+        counts = cube.pop(col + '#个数')
+        cube[col] = (cube[col] / counts).where(counts > 0)
+    cube['站点数量'] = cube['站点数量'].astype(int)
+    cube['单站产出'] = (cube['订单 $M'] / cube['站点数量']).round(2)
+    extra_columns = []
+    if diff_column in sums:
+        sums.remove(diff_column)
+        cube = cube.rename(columns={diff_column: diff_column + '总和'})
+        cube['较上周单站产出'] = (cube[diff_column + '总和'] / cube['站点数量']).round(2)
+        extra_columns = [diff_column + '总和', '较上周单站产出']
+
+    cube = cube[['层级'] + levels[::-1] + sums + means + ['站点数量', '单站产出'] + extra_columns]
+    cube.attrs['levels'] = levels
+    return cube
+
+
+def slice_level(cube, level):
+    """
+    取出某一层级的汇总行，去掉该层级不适用的分组列和“层级”列
+    :param cube: build_rollup_cube 的结果
+    :param level: 层级名称，如“地区”“大区”“全国”
+    :return: DataFrame，明细中没有该层级时为空表
+    """
+    levels = cube.attrs.get('levels', rollup_levels)
+    finer_levels = levels[:levels.index(level)] if level in levels else levels
+    return cube[cube['层级'] == level].drop(columns=['层级'] + finer_levels).reset_index(drop=True)
@@ -0,0 +1,137 @@
+import argparse
+import multiprocessing
+import os
+import time
+from datetime import datetime
+
+import pandas as pd
+from 数据分析1_Grip import compare_sheets, load_latest_sources, sheet_workers
+from 数据分析2_Add import build_achievement_sheet
+from 数据分析3_Tune import build_detail_sheets
+from 数据分析4_PPT生成 import create_ppt
+from 目标表 import load_targets
+from 汇总行 import find_summary_rows
+from 报表写入 import write_report
+
+# 整体功能实现：在同一进程中依次运行 Grip → Add → Tune → PPT，各步骤之间直接传递 DataFrame，
+# 只写出最终的处理后报表和 PPT；可选将每一步的结果保存为检查点，之后从任一步骤继续
+
+stages = ['grip', 'add', 'tune', 'ppt']
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="一次运行完成周数据比对、达成率、区域详情和 PPT 生成")
+    parser.add_argument('folder', help="包含上周和本周数据文件的文件夹路径")
+    parser.add_argument('-o', '--output-dir', default=os.path.join(os.path.expanduser("~"), "Desktop"), help="输出目录，默认为桌面")
+    parser.add_argument('-t', '--targets', help="目标表（.csv 或 .xlsx）路径，不填则目标列为空")
+    parser.add_argument('-w', '--workers', type=int, default=sheet_workers, help="并行比对工作表的进程数")
+    parser.add_argument('-c', '--checkpoint-dir', help="检查点目录，填写后保存每一步的结果")
+    parser.add_argument('--resume-from', choices=stages[1:], help="从指定步骤继续，读取上一步的检查点")
+    parser.add_argument('--full-ppt', action='store_true', help="完整重新生成 PPT，默认只重新生成数据变化的幻灯片")
+    return parser.parse_args()
+
+
+def get_checkpoint_path(checkpoint_dir, stage):
+    return os.path.join(checkpoint_dir, f'{stage}.pkl')
+
+
+def save_checkpoint(checkpoint_dir, stage, frames):
+    """将一步的结果（{工作表名: DataFrame}）保存为 pickle 检查点"""
+    if checkpoint_dir:
+        os.makedirs(checkpoint_dir, exist_ok=True)
+        pd.to_pickle(frames, get_checkpoint_path(checkpoint_dir, stage))
+
+
+def load_checkpoint(checkpoint_dir, stage):
+    path = get_checkpoint_path(checkpoint_dir, stage)
+    if not os.path.exists(path):
+        raise ValueError(f"没有找到检查点 {path}，请先完整运行一次并指定 --checkpoint-dir")
+    print(f"从检查点 {path} 继续")
+    return pd.read_pickle(path)
+
+
+def as_workbook_values(df):
+    """
+    空字符串换成空值，与写入 Excel 再读回后的数据一致，
+    使后续步骤（如按大区分组）的结果与分步运行时相同
+    """
+    return df.mask(df.eq(''))
+
+
+def run_grip(folder_path, workers):
+    """比对最近两周，返回 {工作表名: 带汇总行的比对结果}"""
+    last_week_sources, this_week_sources = load_latest_sources(folder_path, workers)
+    comparison = compare_sheets(last_week_sources, this_week_sources, workers)
+    return {sheet_name: as_workbook_values(df) for sheet_name, df, _ in comparison['sheets']}
+
+
+def run_add(compared, target_file):
+    """为每个比对结果生成达成率报表"""
+    targets = load_targets(target_file) if target_file else None
+    return {sheet_name: build_achievement_sheet(df, targets) for sheet_name, df in compared.items()}
+
+
+def run_tune(achievements, summary_masks=None):
+    """生成区域详情，返回 [(工作表名, DataFrame, 样式配置)]，原工作表和区域详情交替排列"""
+    return build_detail_sheets(achievements, summary_masks)
+
+
+def run_pipeline(args):
+    timings = {}
+    # 汇总行在比对后识别一次，达成率步骤不增删行，区域详情步骤直接使用；从检查点继续时由区域详情步骤现算
+    summary_masks = None
+    start_index = stages.index(args.resume_from) if args.resume_from else 0
+    if start_index:
+        frames = load_checkpoint(args.checkpoint_dir, stages[start_index - 1])
+
+    date_str = datetime.now().strftime("%m月%d日")
+    report_file = os.path.join(args.output_dir, f'处理后的_比对结果{date_str}.xlsx')
+    ppt_file = os.path.join(args.output_dir, "区域业务分析报告.pptx")
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    for stage in stages[start_index:]:
+        stage_start = time.perf_counter()
+        if stage == 'grip':
+            frames = run_grip(args.folder, args.workers)
+            summary_masks = {sheet_name: find_summary_rows(df) for sheet_name, df in frames.items()}
+        elif stage == 'add':
+            frames = run_add(frames, args.targets)
+        elif stage == 'tune':
+            tuned_sheets = run_tune(frames, summary_masks)
+            write_report(report_file, tuned_sheets)
+            print(f"处理后的报表已保存至 {report_file}")
+            frames = {sheet_name: df for sheet_name, df, _ in tuned_sheets}
+        else:
+            # PPT 只使用区域详情工作表
+            details = {sheet_name: df for sheet_name, df in frames.items() if sheet_name.endswith('-区域详情')}
+            reused, total = create_ppt(details, ppt_file, incremental=not args.full_ppt)
+            print(f"PPT 已生成：{ppt_file}（复用 {reused} 张未变化的幻灯片，重新生成 {total - reused} 张）")
+        if stage != 'ppt':
+            save_checkpoint(args.checkpoint_dir, stage, frames)
+        timings[stage] = time.perf_counter() - stage_start
+
+    print("各步骤耗时：" + "，".join(f"{stage} {seconds:.2f} 秒" for stage, seconds in timings.items()))
+    print(f"总耗时 {sum(timings.values()):.2f} 秒")
+
+
+def main():
+    args = parse_args()
+    if args.resume_from and not args.checkpoint_dir:
+        print("使用 --resume-from 时需要同时指定 --checkpoint-dir。")
+        exit(1)
+    if not os.path.isdir(args.folder) and not args.resume_from:
+        print("输入的文件夹路径不存在，请检查后重新运行。")
+        exit(1)
+    try:
+        run_pipeline(args)
+    except ValueError as e:
+        print(e)
+        exit(1)
+    except Exception as e:
+        print(f"处理过程中出现错误: {e}")
+
+
+if __name__ == "__main__":
+    # 打包为 exe 后子进程需要此调用才能正常启动
+    multiprocessing.freeze_support()
+    main()
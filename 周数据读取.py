@@ -0,0 +1,38 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+# 整体功能实现：每个周数据工作簿只解析一次，上周和本周两个文件并发读取
+
+
+def read_workbook(file_path, sheet_names):
+    """
+    打开一次工作簿，一次性读取所需的全部工作表
+    :param file_path: Excel 文件路径
+    :param sheet_names: 需要读取的工作表名称列表
+    :return: {工作表名: DataFrame}，文件中不存在的工作表不包含在内
+    """
+    with pd.ExcelFile(file_path) as xls:
+        available_sheets = [name for name in sheet_names if name in xls.sheet_names]
+        if not available_sheets:
+            return {}
+        return xls.parse(available_sheets)
+
+
+def load_weekly_workbooks(last_week_file, this_week_file, sheet_names):
+    """
+    在两个子进程中并发读取上周和本周的工作簿，并输出读取耗时
+    :param last_week_file: 上周数据文件路径
+    :param this_week_file: 本周数据文件路径
+    :param sheet_names: 需要读取的工作表名称列表
+    :return: (上周数据字典, 本周数据字典)
+    """
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        last_week_future = executor.submit(read_workbook, last_week_file, sheet_names)
+        this_week_future = executor.submit(read_workbook, this_week_file, sheet_names)
+        last_week_data = last_week_future.result()
+        this_week_data = this_week_future.result()
+    print(f"读取上周和本周数据耗时 {time.perf_counter() - start:.2f} 秒")
+    return last_week_data, this_week_data
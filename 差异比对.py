@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+
+# 整体功能实现：把业务主键的多列哈希成一个组合键，只做一次哈希连接，
+# 输出新增、减少和数值变化的行，以及整列计算的差额
+
+
+# 主键中的空值统一转换为该字符串
+na_key = '\x00<NA>'
+
+
+def key_text(value):
+    """单个主键值转换为字符串：整数值不带小数部分，空值统一为 na_key"""
+    if pd.isna(value):
+        return na_key
+    if isinstance(value, (float, np.floating)) and float(value).is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def normalize_key(series):
+    """
+    主键列统一转换为字符串，同一主键不论读成整数、浮点数还是文本，两周的哈希值都相同
+    :return: object 类型的字符串 Series
+    """
+    if pd.api.types.is_integer_dtype(series):
+        # 整数列直接转换，超过 2**53 的编号也不会丢失精度
+        return series.astype('string').fillna(na_key).astype(object)
+    return series.map(key_text).astype(object)
+
+
+def hash_keys(df, key_columns):
+    """
+    将主键各列哈希为一个 uint64 组合键
+    :param df: 数据
+    :param key_columns: 业务主键列
+    :return: 与 df 行一一对应的 uint64 数组
+    """
+    key_df = pd.DataFrame({col: normalize_key(df[col]) for col in key_columns})
+    return pd.util.hash_pandas_object(key_df, index=False).to_numpy()
+
+
+def diff_weeks(last_week_df, this_week_df, key_columns, value_columns, delta_columns=None):
+    """
+    按业务主键比对两周数据
+    :param last_week_df: 上周数据
+    :param this_week_df: 本周数据
+    :param key_columns: 业务主键列
+    :param value_columns: 需要计算差额的数值列
+    :param delta_columns: 差额列名，默认为“列名 差额”
+    :return: {
+        'merged': 本周数据追加差额列（上周没有的行差额为空），
+        'is_new': 本周新增行的布尔数组，
+        'added': 本周新增的行，
+        'removed': 本周已不存在的上周行，
+        'changed': 两周都有但数值有变化的行，含上周值和差额
+    }
+    """
+    delta_columns = delta_columns or [col + " 差额" for col in value_columns]
+    this_keys = hash_keys(this_week_df, key_columns)
+    last_keys = hash_keys(last_week_df, key_columns)
+
+    # 上周主键重复时以第一次出现的行为准，保证结果行数与本周一致
+    last_first = ~pd.Series(last_keys).duplicated().to_numpy()
+    positions = pd.Index(last_keys[last_first]).get_indexer(this_keys)
+    matched = positions >= 0
+
+    this_values = this_week_df[value_columns].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float)
+    last_values = last_week_df[value_columns].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float)[last_first]
+    previous = np.full(this_values.shape, np.nan)
+    previous[matched] = last_values[positions[matched]]
+    deltas = this_values - previous
+
+    merged_df = this_week_df.reset_index(drop=True)
+    merged_df[value_columns] = this_values
+    merged_df[delta_columns] = deltas
+
+    # 差额不为 0，或一周有值、另一周为空，都算数值变化
+    value_changed = ((deltas != 0) & ~np.isnan(deltas)) | (np.isnan(this_values) != np.isnan(previous))
+    changed_mask = matched & value_changed.any(axis=1)
+    changed_df = merged_df.loc[changed_mask, key_columns + value_columns + delta_columns].copy()
+    changed_df[[col + " 上周" for col in value_columns]] = previous[changed_mask]
+
+    return {
+        'merged': merged_df,
+        'is_new': ~matched,
+        'added': this_week_df[~matched],
+        'removed': last_week_df[~pd.Series(last_keys).isin(this_keys).to_numpy()],
+        'changed': changed_df,
+    }
@@ -0,0 +1,205 @@
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+
+import pandas as pd
+from 进程池 import run_in_process
+
+# 整体功能实现：每个带日期的周数据工作簿只解析一次，转换为压缩的列式快照（Parquet），之后直接从快照比对任意两周
+
+try:
+    import pyarrow  # noqa: F401
+    has_parquet = True
+except ImportError:
+    has_parquet = False
+
+manifest_name = 'manifest.json'
+
+
+# 根据文件名中的日期信息排序，假设文件名中包含日期（如 20250207、20250215）
+def get_date_from_filename(filename):
+    match = re.search(r'\d{8}', filename)
+    return int(match.group()) if match else 0
+
+
+def get_snapshot_dir(folder_path):
+    """快照默认存放在数据文件夹下的“周数据快照”目录"""
+    return os.path.join(folder_path, '周数据快照')
+
+
+def read_manifest(snapshot_dir):
+    """读取快照清单：{源文件名: {日期、源文件、大小、修改时间、各工作表的快照文件}}"""
+    manifest_path = os.path.join(snapshot_dir, manifest_name)
+    if not os.path.exists(manifest_path):
+        return {}
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def write_manifest(snapshot_dir, manifest):
+    """先写临时文件再替换，避免中断时留下损坏的清单"""
+    manifest_path = os.path.join(snapshot_dir, manifest_name)
+    temp_path = f'{manifest_path}.{os.getpid()}.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(temp_path, manifest_path)
+
+
+def save_sheet(df, path_without_ext):
+    """
+    优先保存为 zstd 压缩的 Parquet；列类型混杂等 Parquet 无法表示的情况退回压缩的 pickle
+    :return: 实际写入的文件名
+    """
+    try:
+        df.to_parquet(path_without_ext + '.parquet', compression='zstd', index=False)
+        return os.path.basename(path_without_ext) + '.parquet'
+    except Exception:
+        df.to_pickle(path_without_ext + '.pkl.gz')
+        return os.path.basename(path_without_ext) + '.pkl.gz'
+
+
+def load_sheet(path):
+    """按扩展名读取单个工作表快照"""
+    if path.endswith('.parquet'):
+        return pd.read_parquet(path)
+    return pd.read_pickle(path)
+
+
+def is_fresh(entry, file_path):
+    """清单条目与源文件的文件名、大小和修改时间都一致时，快照可以直接使用"""
+    if not entry:
+        return False
+    stat = os.stat(file_path)
+    return entry['source'] == os.path.basename(file_path) and entry['size'] == stat.st_size and entry['mtime'] == stat.st_mtime
+
+
+def save_workbook(workbook_data, file_path, subdir, snapshot_dir):
+    """
+    将已解析的工作簿写入快照目录下的 subdir 子目录
+    :param workbook_data: {工作表名: DataFrame}
+    :param file_path: 源 Excel 文件路径，用于记录大小和修改时间
+    :param subdir: 子目录名
+    :param snapshot_dir: 快照目录
+    :return: 清单条目
+    """
+    subdir_path = os.path.join(snapshot_dir, subdir)
+    os.makedirs(subdir_path, exist_ok=True)
+    sheets = {}
+    # 工作表名可能含有文件名不允许的字符，快照文件按序号命名
+    for idx, (sheet_name, df) in enumerate(workbook_data.items()):
+        sheets[sheet_name] = os.path.join(subdir, save_sheet(df, os.path.join(subdir_path, str(idx))))
+    stat = os.stat(file_path)
+    return {
+        'source': os.path.basename(file_path),
+        'size': stat.st_size,
+        'mtime': stat.st_mtime,
+        'sheets': sheets,
+    }
+
+
+def ingest_workbook(file_path, date, snapshot_dir):
+    """
+    解析一个周数据工作簿的全部工作表并写入快照
+    :param file_path: Excel 文件路径
+    :param date: 8 位日期字符串
+    :param snapshot_dir: 快照目录
+    :return: 该文件的清单条目，快照存放在以文件名命名的子目录中
+    """
+    entry = save_workbook(pd.read_excel(file_path, sheet_name=None), file_path, os.path.basename(file_path), snapshot_dir)
+    entry['date'] = date
+    return entry
+
+
+def ingest_folder(folder_path, snapshot_dir=None, workers=None):
+    """
+    将文件夹中新增或有改动的带日期工作簿转换为快照，已转换且未改动的文件不再解析
+    :param folder_path: 周数据文件夹
+    :param snapshot_dir: 快照目录，默认为 get_snapshot_dir(folder_path)
+    :param workers: 并发转换的进程数，默认按待转换文件数和 CPU 核数取较小值，设为 1 时在当前进程中转换
+    :return: {日期: 源文件名}，按时间排序；同一日期有多个文件时取修改时间最晚的
+    """
+    snapshot_dir = snapshot_dir or get_snapshot_dir(folder_path)
+    os.makedirs(snapshot_dir, exist_ok=True)
+    # 按日期记录的旧版清单条目没有 date 字段，全部重新转换
+    manifest = {name: entry for name, entry in read_manifest(snapshot_dir).items() if 'date' in entry}
+
+    pending = {}
+    for f in os.listdir(folder_path):
+        if not f.lower().endswith('.xlsx') or f.startswith('~$'):
+            continue
+        date = get_date_from_filename(f)
+        if not date:
+            print(f"文件 {f} 的文件名中没有 8 位日期，跳过。")
+            continue
+        file_path = os.path.join(folder_path, f)
+        if is_fresh(manifest.get(f), file_path):
+            continue
+        pending[f] = file_path
+
+    if pending:
+        start = time.perf_counter()
+        workers = min(len(pending), workers or os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=workers) if workers > 1 else nullcontext() as executor:
+            submit = executor.submit if executor else run_in_process
+            futures = {f: submit(ingest_workbook, file_path, str(get_date_from_filename(f)), snapshot_dir)
+                       for f, file_path in pending.items()}
+            for f, future in futures.items():
+                try:
+                    manifest[f] = future.result()
+                except Exception as e:
+                    print(f"转换文件 {f} 时出现错误: {e}")
+        write_manifest(snapshot_dir, manifest)
+        print(f"转换 {len(pending)} 个周数据文件耗时 {time.perf_counter() - start:.2f} 秒")
+
+    weeks = {}
+    for name, entry in sorted(manifest.items(), key=lambda item: (int(item[1]['date']), item[1]['mtime'])):
+        if entry['date'] in weeks:
+            print(f"文件 {weeks[entry['date']]} 与 {name} 的日期相同，{entry['date']} 使用较新的 {name}。")
+        weeks[entry['date']] = name
+    return weeks
+
+
+def get_sheet_paths(snapshot_dir, name, sheet_names):
+    """
+    取得某个工作簿指定工作表的快照文件路径，供子进程自行读取
+    :param name: 源文件名，即清单中的键
+    :return: {工作表名: 快照文件路径}，快照中不存在的工作表不包含在内
+    """
+    entry = read_manifest(snapshot_dir)[name]
+    return {
+        sheet_name: os.path.join(snapshot_dir, entry['sheets'][sheet_name])
+        for sheet_name in sheet_names
+        if sheet_name in entry['sheets']
+    }
+
+
+def get_cache_dir(file_path):
+    """工作簿的列式副本默认存放在同一文件夹下的“列式缓存”目录"""
+    return os.path.join(os.path.dirname(os.path.abspath(file_path)), '列式缓存')
+
+
+def read_workbook_cached(file_path, cache_dir=None):
+    """
+    读取工作簿的全部工作表：有未过期的列式副本时直接读取副本，否则只解析一次工作簿并写入副本
+    :param file_path: Excel 文件路径
+    :param cache_dir: 副本目录，默认为 get_cache_dir(file_path)
+    :return: ({工作表名: DataFrame}，是否来自副本)，工作表按工作簿中的顺序排列
+    """
+    # 每个工作簿单独一个目录和清单，并行处理多个工作簿时互不影响
+    workbook_dir = os.path.join(cache_dir or get_cache_dir(file_path), os.path.basename(file_path))
+    key = os.path.basename(file_path)
+    manifest = read_manifest(workbook_dir)
+    entry = manifest.get(key)
+    if is_fresh(entry, file_path):
+        return {sheet_name: load_sheet(os.path.join(workbook_dir, path)) for sheet_name, path in entry['sheets'].items()}, True
+
+    workbook_data = pd.read_excel(file_path, sheet_name=None)
+    try:
+        manifest[key] = save_workbook(workbook_data, file_path, '工作表', workbook_dir)
+        write_manifest(workbook_dir, manifest)
+    except OSError as e:
+        print(f"列式副本无法保存，下次仍将解析工作簿: {e}")
+    return workbook_data, False
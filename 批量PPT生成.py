@@ -0,0 +1,189 @@
+import argparse
+import io
+import multiprocessing
+import os
+import re
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+
+import pandas as pd
+from 进程池 import run_in_process
+from 汇总行 import drop_summary_rows
+from 区域汇总 import build_rollup_cube
+from 数据分析4_PPT生成 import create_ppt, filter_target_files, find_excel_files
+
+# 整体功能实现：一次运行为每个活动、每个大区各生成一份 PPT。模板和处理后的报表只读取一次，
+# 所有活动的明细合并成一张多层级汇总表，各份 PPT 的图表数据都从这张表中切出，再在进程池中并行写出
+
+detail_suffix = '-区域详情'
+deck_kinds = ['活动', '大区']
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="按活动和大区批量生成区域业务分析 PPT")
+    parser.add_argument('path', help="处理后的报表文件路径，或包含这些文件的文件夹路径")
+    parser.add_argument('-o', '--output-dir', default=os.path.join(os.path.expanduser("~"), "Desktop", "区域业务分析"), help="PPT 输出目录，默认为桌面上的“区域业务分析”文件夹")
+    parser.add_argument('-t', '--template', help="模板 PPT 路径，默认使用空白模板")
+    parser.add_argument('-w', '--workers', type=int, default=os.cpu_count() or 1, help="并行生成 PPT 的进程数，默认为 CPU 核数")
+    parser.add_argument('--by', choices=deck_kinds, action='append', help="只按活动或只按大区生成，默认两种都生成")
+    parser.add_argument('--full', action='store_true', help="完整重新生成，默认只重新生成数据变化的幻灯片")
+    parser.add_argument('--benchmark', type=int, metavar='轮数', help="测速模式：完整生成指定轮数（写入临时目录），输出每秒生成的 PPT 份数")
+    return parser.parse_args()
+
+
+def read_activity_sheets(excel_files):
+    """
+    读取包含区域详情的报表中对应的活动明细工作表
+    :param excel_files: Excel 文件列表
+    :return: {活动: 明细 DataFrame}，多个文件中有同名活动时以后读取的为准
+    """
+    activity_sheets = {}
+    for file_path in filter_target_files(excel_files):
+        try:
+            with pd.ExcelFile(file_path) as xls:
+                activities = [name[:-len(detail_suffix)] for name in xls.sheet_names if name.endswith(detail_suffix)]
+                activities = [name for name in activities if name in xls.sheet_names]
+                if activities:
+                    activity_sheets.update(xls.parse(activities))
+        except Exception as e:
+            print(f"读取文件 '{file_path}' 时出现错误: {e}")
+    return activity_sheets
+
+
+def build_rollup_frame(activity_sheets):
+    """
+    各活动的明细去除汇总行后生成多层级汇总，合并为一张表
+    :return: 带“活动”列的多层级汇总表
+    """
+    cubes = []
+    for activity, df in activity_sheets.items():
+        cube = build_rollup_cube(drop_summary_rows(df))
+        cube.insert(0, '活动', activity)
+        cubes.append(cube)
+    return pd.concat(cubes, ignore_index=True)
+
+
+def slide_frame(df, category_col):
+    """只保留图表需要的分类和订单金额两列"""
+    return df[[category_col, '订单 $M']].reset_index(drop=True)
+
+
+def plan_decks(rollup, kinds=None):
+    """
+    从合并的汇总表中切出每份 PPT 的幻灯片数据
+    :param rollup: build_rollup_frame 的结果
+    :param kinds: 生成哪几类 PPT，默认为 deck_kinds
+    :return: {PPT 名称: {幻灯片标题: DataFrame}}
+    """
+    kinds = kinds or deck_kinds
+    regions = rollup[rollup['层级'] == '大区']
+    areas = rollup[rollup['层级'] == '地区']
+    decks = {}
+    if '活动' in kinds:
+        # 每个活动一份：第一页为各大区对比，之后每个大区一页，按地区展开
+        for activity, group in regions.groupby('活动', sort=False):
+            slides = {f'{activity}{detail_suffix}': slide_frame(group, '大区')}
+            for region, sub in areas[areas['活动'] == activity].groupby('大区'):
+                slides[f'{activity}-{region}'] = slide_frame(sub, '地区')
+            decks[f'活动_{activity}'] = slides
+    if '大区' in kinds:
+        # 每个大区一份：每个活动一页，按地区展开
+        for region, group in areas.groupby('大区'):
+            decks[f'大区_{region}'] = {f'{region}-{activity}': slide_frame(sub, '地区')
+                                      for activity, sub in group.groupby('活动', sort=False)}
+    return decks
+
+
+def get_deck_path(output_dir, deck_name):
+    """PPT 文件路径，名称中不能用于文件名的字符替换为下划线"""
+    return os.path.join(output_dir, re.sub(r'[\\/:*?"<>|]', '_', deck_name) + '.pptx')
+
+
+def build_deck(slides, output_path, template_bytes, incremental):
+    """
+    在子进程中生成一份 PPT
+    :param slides: {幻灯片标题: DataFrame}
+    :param output_path: PPT 保存路径
+    :param template_bytes: 模板 PPT 的内容，为空时使用空白模板
+    :param incremental: 是否复用已有 PPT 中未变化的幻灯片
+    :return: (复用的幻灯片数, 耗时（秒）)
+    """
+    start = time.perf_counter()
+    reused, _ = create_ppt(slides, output_path, incremental, io.BytesIO(template_bytes) if template_bytes else None)
+    return reused, time.perf_counter() - start
+
+
+def build_decks(decks, output_dir, template_bytes, workers, incremental, verbose=True):
+    """
+    并行生成全部 PPT，单份出错不影响其他
+    :return: 成功生成的份数
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    deck_names = list(decks)
+    succeeded = 0
+    workers = max(1, min(workers, len(deck_names)))
+    with ProcessPoolExecutor(max_workers=workers) if workers > 1 else nullcontext() as executor:
+        submit = executor.submit if executor else run_in_process
+        futures = [submit(build_deck, decks[deck_name], get_deck_path(output_dir, deck_name), template_bytes, incremental)
+                   for deck_name in deck_names]
+        for i, (deck_name, future) in enumerate(zip(deck_names, futures), start=1):
+            try:
+                reused, seconds = future.result()
+                succeeded += 1
+                if verbose:
+                    print(f"[{i}/{len(deck_names)}] {deck_name}（{len(decks[deck_name])} 页，复用 {reused} 页，{seconds:.2f} 秒）")
+            except Exception as e:
+                print(f"[{i}/{len(deck_names)}] {deck_name} 生成时出现错误: {e}")
+    return succeeded
+
+
+def run_benchmark(decks, template_bytes, workers, rounds):
+    """完整生成指定轮数，输出每秒生成的 PPT 份数"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        start = time.perf_counter()
+        built = sum(build_decks(decks, temp_dir, template_bytes, workers, incremental=False, verbose=False)
+                    for _ in range(rounds))
+        seconds = time.perf_counter() - start
+    workers = max(1, min(workers, len(decks)))
+    print(f"测速：{rounds} 轮共生成 {built} 份 PPT（{workers} 个进程），耗时 {seconds:.2f} 秒，"
+          f"每秒 {built / seconds:.2f} 份")
+
+
+def main():
+    args = parse_args()
+    if os.path.isfile(args.path) and args.path.lower().endswith(('.xlsx', '.xls')):
+        excel_files = [args.path]
+    elif os.path.isdir(args.path):
+        excel_files = find_excel_files(args.path)
+    else:
+        print("输入的路径不是有效的 Excel 文件路径或文件夹路径，请检查后重新运行程序。")
+        exit(1)
+
+    # 模板和数据只在主进程读取一次
+    start = time.perf_counter()
+    template_bytes = None
+    if args.template:
+        with open(args.template, 'rb') as f:
+            template_bytes = f.read()
+    activity_sheets = read_activity_sheets(excel_files)
+    if not activity_sheets:
+        print("未找到任何包含区域详情的活动工作表，程序退出。")
+        exit(1)
+    decks = plan_decks(build_rollup_frame(activity_sheets), args.by)
+    print(f"读取 {len(activity_sheets)} 个活动并生成图表数据，共 {len(decks)} 份 PPT，耗时 {time.perf_counter() - start:.2f} 秒")
+
+    if args.benchmark:
+        run_benchmark(decks, template_bytes, args.workers, args.benchmark)
+        return
+
+    start = time.perf_counter()
+    succeeded = build_decks(decks, args.output_dir, template_bytes, args.workers, not args.full)
+    print(f"共 {len(decks)} 份 PPT，成功 {succeeded} 份，总耗时 {time.perf_counter() - start:.2f} 秒，已保存至 {args.output_dir}")
+
+
+if __name__ == "__main__":
+    # 打包为 exe 后子进程需要此调用才能正常启动
+    multiprocessing.freeze_support()
+    main()
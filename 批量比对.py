@@ -0,0 +1,124 @@
+import argparse
+import glob
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+from 数据分析1_Grip import all_week_pairs, compare_folder, latest_week_pair
+
+# 整体功能实现：一次运行批量比对多个团队的周数据文件夹，不需要逐个输入路径，
+# 每个文件夹输出一份比对结果，最后输出运行汇总
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="批量比对多个文件夹中的上周和本周数据")
+    parser.add_argument('folders', nargs='*', help="数据文件夹路径，支持通配符，如 D:/周报/*")
+    parser.add_argument('-l', '--folder-list', help="文件夹列表文件，每行一个路径（同样支持通配符）")
+    parser.add_argument('-o', '--output-dir', required=True, help="比对结果的输出目录")
+    parser.add_argument('-w', '--workers', type=int, default=os.cpu_count() or 1, help="同时处理的文件夹数，默认为 CPU 核数")
+    parser.add_argument('--all-weeks', action='store_true', help="逐周比对文件夹中全部相邻的两周，默认只比对最近两周")
+    return parser.parse_args()
+
+
+def expand_folders(patterns):
+    """
+    展开路径和通配符，去重后保持输入顺序
+    :return: (文件夹列表, 没有匹配到文件夹的输入)
+    """
+    folders = []
+    unmatched = []
+    for pattern in patterns:
+        matches = [path for path in sorted(glob.glob(pattern)) if os.path.isdir(path)]
+        if not matches:
+            unmatched.append(pattern)
+        for path in matches:
+            path = os.path.abspath(path)
+            if path not in folders:
+                folders.append(path)
+    return folders, unmatched
+
+
+def get_output_files(folders, output_dir):
+    """每个文件夹一个输出文件，以文件夹名命名，同名文件夹依次加序号，直到与已分配的文件名都不相同（不区分大小写）"""
+    output_files = {}
+    used = set()
+    for folder in folders:
+        base_name = os.path.basename(os.path.normpath(folder)) or 'root'
+        name = base_name
+        suffix = 1
+        while name.casefold() in used:
+            suffix += 1
+            name = f"{base_name}_{suffix}"
+        used.add(name.casefold())
+        output_files[folder] = os.path.join(output_dir, f"{name}_比对结果.xlsx")
+    return output_files
+
+
+def run_folder(folder_path, output_file, all_weeks):
+    """
+    在子进程中比对一个文件夹，出错时记录原因而不中断其他文件夹
+    :return: 该文件夹的运行结果
+    """
+    start = time.perf_counter()
+    result = {'文件夹': folder_path, '状态': '成功', '输出文件': '', '出错工作表': '', '说明': ''}
+    try:
+        # 各文件夹已经并行处理，文件夹内的工作表逐个处理，避免进程数成倍增加
+        outputs = compare_folder(folder_path, output_file, all_week_pairs if all_weeks else latest_week_pair, workers=1)
+        failed = sorted({sheet for sheets in outputs.values() for sheet in sheets})
+        result['输出文件'] = '；'.join(outputs)
+        result['出错工作表'] = '、'.join(failed)
+        if failed:
+            result['状态'] = '部分成功'
+    except Exception as e:
+        result['状态'] = '失败'
+        result['说明'] = str(e)
+    result['耗时（秒）'] = round(time.perf_counter() - start, 2)
+    return result
+
+
+def main():
+    args = parse_args()
+    patterns = list(args.folders)
+    if args.folder_list:
+        with open(args.folder_list, 'r', encoding='utf-8') as f:
+            patterns += [line.strip() for line in f if line.strip()]
+
+    folders, unmatched = expand_folders(patterns)
+    for pattern in unmatched:
+        print(f"没有找到文件夹：{pattern}")
+    if not folders:
+        print("没有需要处理的文件夹，请检查输入。")
+        exit(1)
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    output_files = get_output_files(folders, args.output_dir)
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=max(1, min(args.workers, len(folders)))) as executor:
+        futures = [executor.submit(run_folder, folder, output_files[folder], args.all_weeks) for folder in folders]
+        # 按输入顺序汇总结果
+        results = [future.result() for future in futures]
+
+    summary_df = pd.DataFrame(results)
+    summary_file = os.path.join(args.output_dir, "运行汇总.csv")
+    summary_df.to_csv(summary_file, index=False, encoding='utf-8-sig')
+
+    print("\n运行汇总：")
+    for result in results:
+        line = f"[{result['状态']}] {result['文件夹']}（{result['耗时（秒）']} 秒）"
+        if result['出错工作表']:
+            line += f" 出错工作表：{result['出错工作表']}"
+        if result['说明']:
+            line += f" {result['说明']}"
+        print(line)
+    succeeded = sum(result['状态'] != '失败' for result in results)
+    print(f"共 {len(results)} 个文件夹，成功 {succeeded} 个，失败 {len(results) - succeeded} 个，"
+          f"总耗时 {time.perf_counter() - start:.2f} 秒，汇总已保存至 {summary_file}")
+
+
+if __name__ == "__main__":
+    # 打包为 exe 后子进程需要此调用才能正常启动
+    multiprocessing.freeze_support()
+    main()
@@ -0,0 +1,420 @@
+import io
+import posixpath
+import zipfile
+from copy import deepcopy
+import numpy as np
+import pandas as pd
+import xlsxwriter
+from lxml import etree
+from xlsxwriter.utility import xl_range
+
+# 整体功能实现：写入 Excel 的同时设置样式，逐行流式输出（constant_memory 模式），相同样式只创建一次，
+# 按数值或按行变化的样式用条件格式表达
+
+# 所有报表共用的基础字体和对齐方式
+base_format = {'font_name': '微软雅黑', 'font_size': 11, 'align': 'center', 'valign': 'vcenter'}
+# 没有单独配置数字格式的日期列，与 pandas 写入 Excel 时的默认格式一致
+datetime_format = 'yyyy-mm-dd hh:mm:ss'
+
+# 在已有工作簿中插入工作表（insert_sheets）时用到的 Office Open XML 命名空间
+main_ns = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+rel_ns = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+package_rel_ns = 'http://schemas.openxmlformats.org/package/2006/relationships'
+content_types_ns = 'http://schemas.openxmlformats.org/package/2006/content-types'
+worksheet_content_type = 'application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml'
+# styles.xml 中各节的规范顺序，新建的节需插在正确位置
+style_sections = ['numFmts', 'fonts', 'fills', 'borders', 'cellStyleXfs', 'cellXfs', 'cellStyles', 'dxfs',
+                  'tableStyles', 'colors', 'extLst']
+
+# 比对结果（数据分析1_Grip.py）
+compare_layout = {
+    'header': {'bold': True},
+    'header_height': 18,
+    'row_height': 18,
+    'column_widths': {'A': 31, 'B': 12, 'C': 12, 'D': 10, 'J': 12, 'K': 12, 'L': 12, 'M': 13.8, 'N': 13.8, 'O': 13.8},
+    'sign_columns': ["SQL $M 差额", "商机 $M 差额", "订单 $M 差额"],
+    'positive': {'bold': True},
+    'negative': {'bold': True, 'font_color': '#FF0000'},
+    'highlight': {'pattern': 1, 'bg_color': '#FFFF00'},
+    'summary': {'bold': True, 'pattern': 1, 'bg_color': '#62B460'},
+    'freeze_panes': (1, 0),
+}
+
+# 比对中减少的项目（数据分析1_Grip.py），保持源数据原样
+removed_layout = {
+    'header': {'bold': True},
+    'header_height': 18,
+    'row_height': 18,
+    'column_widths': {'A': 31},
+    'default_width': 12,
+    'freeze_panes': (1, 0),
+}
+
+# 达成率报表（数据分析2_Add.py）
+achievement_layout = {
+    'header': {'bold': True, 'text_wrap': True},
+    'header_height': 35,
+    'row_height': 22.5,
+    'column_widths': {
+        'A': 28, 'B': 10, 'C': 10, 'D': 7.5, 'E': 10, 'F': 10, 'G': 10, 'H': 10, 'I': 10, 'J': 10,
+        'K': 11, 'L': 8, 'M': 8, 'N': 11, 'O': 11, 'P': 11, 'Q': 11,
+    },
+    'number_formats': {'SQL达成率': '0.00%', '订单转化率': '0.00%', '订单达成率': '0.00%'},
+    'summary': {'bold': True, 'pattern': 1, 'bg_color': '#00FF00'},
+    'freeze_panes': (1, 0),
+}
+
+# 区域详情（数据分析3_Tune.py）
+detail_layout = {
+    'header': {'bold': True, 'text_wrap': True, 'border': 1},
+    'body': {'text_wrap': True, 'border': 1},
+    'header_height': 32,
+    'row_height': 22.5,
+    'default_width': 10,
+    'number_formats': {
+        'SQL $M': '0.00',
+        '订单 $M': '0.00',
+        '商机 $M': '0.00',
+        'SQL达成率': '0.00%',
+        '订单转化率': '0.00%',
+        '订单达成率': '0.00%',
+        '单站产出': '0.00',
+        '较上周单站产出': '0.00'
+    },
+}
+
+
+def to_rows(df):
+    """将 DataFrame 转换为逐行的 Python 值，缺失值统一为 None"""
+    values = df.astype(object).where(df.notna(), None)
+    return values.itertuples(index=False, name=None)
+
+
+def row_ranges(mask):
+    """
+    将行布尔序列合并为连续区间
+    :param mask: 布尔序列
+    :return: [(起始行号, 结束行号)]，行号从 0 开始
+    """
+    rows = np.flatnonzero(np.asarray(mask, dtype=bool))
+    if rows.size == 0:
+        return []
+    breaks = np.flatnonzero(np.diff(rows) != 1)
+    starts = np.concatenate(([rows[0]], rows[breaks + 1]))
+    ends = np.concatenate((rows[breaks], [rows[-1]]))
+    return list(zip(starts.tolist(), ends.tolist()))
+
+
+def add_conditional_formats(workbook, worksheet, df, layout, highlight_rows):
+    """
+    用工作表级的条件格式代替逐单元格设置：新增行整行填充、差额正数加粗、负数标红
+    规则数量只与区间数有关，与行数无关
+    """
+    last_col = len(df.columns) - 1
+    last_row = len(df)
+    if last_col < 0 or last_row == 0:
+        return
+
+    if highlight_rows is not None and 'highlight' in layout:
+        ranges = [
+            xl_range(start + 1, 0, end + 1, last_col)
+            for start, end in row_ranges(highlight_rows)
+        ]
+        if ranges:
+            worksheet.conditional_format(ranges[0], {
+                'type': 'formula',
+                'criteria': 'TRUE',
+                'format': workbook.add_format(layout['highlight']),
+                'multi_range': ' '.join(ranges),
+            })
+
+    sign_ranges = [
+        xl_range(1, col_idx, last_row, col_idx)
+        for col_idx, col_name in enumerate(df.columns)
+        if col_name in layout.get('sign_columns', [])
+    ]
+    if sign_ranges:
+        for criteria, sign in (('>', 'positive'), ('<', 'negative')):
+            worksheet.conditional_format(sign_ranges[0], {
+                'type': 'cell',
+                'criteria': criteria,
+                'value': 0,
+                'format': workbook.add_format(layout[sign]),
+                'multi_range': ' '.join(sign_ranges),
+            })
+
+
+def get_number_format(df, col, layout):
+    """列的数字格式：优先使用样式配置，日期列默认按 datetime_format 显示"""
+    num_format = layout.get('number_formats', {}).get(col)
+    if num_format is None and pd.api.types.is_datetime64_any_dtype(df[col]):
+        num_format = datetime_format
+    return num_format
+
+
+def write_sheet(workbook, formats, sheet_name, df, layout, highlight_rows=None):
+    """
+    按样式配置逐行写入一个工作表
+    :param workbook: xlsxwriter 工作簿
+    :param formats: 整个工作簿共用的样式缓存
+    :param sheet_name: 工作表名称
+    :param df: 要写入的数据
+    :param layout: 样式配置
+    :param highlight_rows: 需高亮的数据行（布尔序列，按顺序对应 df 的行，超出部分不高亮）
+    """
+    worksheet = workbook.add_worksheet(sheet_name)
+    columns = list(df.columns)
+    number_formats = [get_number_format(df, col, layout) for col in columns]
+    has_summary = 'summary' in layout
+    last_row = len(df)
+
+    def get_format(kind, num_format=None):
+        # 同一配置下相同的样式组合只创建一次格式对象
+        key = (id(layout), kind, num_format)
+        if key not in formats:
+            props = dict(base_format)
+            if kind == 'header':
+                props.update(layout.get('header', {}))
+            else:
+                props.update(layout.get('body', {}))
+                if num_format:
+                    props['num_format'] = num_format
+                if kind == 'summary':
+                    props.update(layout['summary'])
+            formats[key] = workbook.add_format(props)
+        return formats[key]
+
+    # 列宽、冻结窗格和条件格式与行顺序无关，先行设置
+    if 'default_width' in layout and columns:
+        worksheet.set_column(0, len(columns) - 1, layout['default_width'])
+    for letter, width in layout.get('column_widths', {}).items():
+        worksheet.set_column(f'{letter}:{letter}', width)
+    if 'freeze_panes' in layout:
+        worksheet.freeze_panes(*layout['freeze_panes'])
+    add_conditional_formats(workbook, worksheet, df, layout, highlight_rows)
+
+    worksheet.set_row(0, layout.get('header_height'))
+    for col_idx, col_name in enumerate(columns):
+        worksheet.write(0, col_idx, col_name, get_format('header'))
+
+    for row_idx, row in enumerate(to_rows(df), start=1):
+        kind = 'summary' if has_summary and row_idx == last_row else 'body'
+        worksheet.set_row(row_idx, layout.get('row_height'))
+        for col_idx, value in enumerate(row):
+            if value is None:
+                worksheet.write_blank(row_idx, col_idx, None, get_format(kind))
+            else:
+                worksheet.write(row_idx, col_idx, value, get_format(kind, number_formats[col_idx]))
+    return worksheet
+
+
+def write_report(output_file, sheets, highlights=None):
+    """
+    一次性写出带样式的报表文件，不再回读工作簿设置样式
+    :param output_file: 输出文件路径
+    :param sheets: [(工作表名, DataFrame, 样式配置)] 列表，按顺序写入
+    :param highlights: {工作表名: 需高亮的行布尔序列}
+    """
+    highlights = highlights or {}
+    formats = {}
+    with xlsxwriter.Workbook(output_file, {'constant_memory': True}) as workbook:
+        for sheet_name, df, layout in sheets:
+            write_sheet(workbook, formats, sheet_name, df, layout, highlights.get(sheet_name))
+
+
+def part_rels(part):
+    """部件对应的关系文件路径，如 xl/workbook.xml -> xl/_rels/workbook.xml.rels"""
+    folder, name = posixpath.split(part)
+    return posixpath.join(folder, '_rels', f'{name}.rels')
+
+
+def resolve_target(part, target):
+    """将关系中的 Target 解析为压缩包内的路径"""
+    if target.startswith('/'):
+        return target.lstrip('/')
+    return posixpath.normpath(posixpath.join(posixpath.dirname(part), target))
+
+
+def to_xml(root):
+    return etree.tostring(root, xml_declaration=True, encoding='UTF-8', standalone=True)
+
+
+def style_section(styles, name):
+    """取样式表中的一节，不存在时按规范顺序创建"""
+    section = styles.find(f'{{{main_ns}}}{name}')
+    if section is None:
+        section = etree.SubElement(styles, f'{{{main_ns}}}{name}', count='0')
+        later = [styles.find(f'{{{main_ns}}}{tag}') for tag in style_sections[style_sections.index(name) + 1:]]
+        later = [element for element in later if element is not None]
+        if later:
+            later[0].addprevious(section)
+    return section
+
+
+def merge_styles(styles, new_styles):
+    """
+    将新工作表的样式追加到原工作簿的样式表中，原有样式编号不变
+    :param styles: 原工作簿 styles.xml 根元素，就地修改
+    :param new_styles: 新工作表所在工作簿的 styles.xml 根元素
+    :return: (单元格样式编号映射, 条件格式样式编号映射)
+    """
+    def items(root, section, tag):
+        element = root.find(f'{{{main_ns}}}{section}')
+        return [] if element is None else element.findall(f'{{{main_ns}}}{tag}')
+
+    def append(section, tag, elements):
+        target = style_section(styles, section)
+        offset = len(target.findall(f'{{{main_ns}}}{tag}'))
+        for element in elements:
+            target.append(element)
+        target.set('count', str(offset + len(elements)))
+        return offset
+
+    # 自定义数字格式（编号 164 起）按格式代码合并，已有的格式直接复用
+    existing = {fmt.get('formatCode'): int(fmt.get('numFmtId')) for fmt in items(styles, 'numFmts', 'numFmt')}
+    next_id = max([163] + list(existing.values())) + 1
+    num_format_ids = {}
+    added_formats = []
+    for fmt in items(new_styles, 'numFmts', 'numFmt'):
+        code = fmt.get('formatCode')
+        if code not in existing:
+            existing[code] = next_id
+            next_id += 1
+            added_formats.append(etree.Element(f'{{{main_ns}}}numFmt', numFmtId=str(existing[code]), formatCode=code))
+        num_format_ids[fmt.get('numFmtId')] = str(existing[code])
+    if added_formats:
+        append('numFmts', 'numFmt', added_formats)
+
+    offsets = {
+        'fontId': append('fonts', 'font', [deepcopy(e) for e in items(new_styles, 'fonts', 'font')]),
+        'fillId': append('fills', 'fill', [deepcopy(e) for e in items(new_styles, 'fills', 'fill')]),
+        'borderId': append('borders', 'border', [deepcopy(e) for e in items(new_styles, 'borders', 'border')]),
+    }
+    cell_formats = []
+    for xf in items(new_styles, 'cellXfs', 'xf'):
+        xf = deepcopy(xf)
+        for attr, offset in offsets.items():
+            if xf.get(attr) is not None:
+                xf.set(attr, str(int(xf.get(attr)) + offset))
+        if xf.get('numFmtId') in num_format_ids:
+            xf.set('numFmtId', num_format_ids[xf.get('numFmtId')])
+        # 单元格样式统一挂在原工作簿的“常规”样式下
+        xf.set('xfId', '0')
+        cell_formats.append(xf)
+    xf_offset = append('cellXfs', 'xf', cell_formats)
+
+    dxfs = [deepcopy(e) for e in items(new_styles, 'dxfs', 'dxf')]
+    dxf_offset = append('dxfs', 'dxf', dxfs) if dxfs else 0
+    return ({str(i): str(i + xf_offset) for i in range(len(cell_formats))},
+            {str(i): str(i + dxf_offset) for i in range(len(dxfs))})
+
+
+def remap_sheet_styles(sheet, xf_ids, dxf_ids):
+    """新工作表中的样式编号改为合并后的编号，并取消选中状态"""
+    for tag, attr, ids in (('c', 's', xf_ids), ('row', 's', xf_ids), ('col', 'style', xf_ids), ('cfRule', 'dxfId', dxf_ids)):
+        for element in sheet.iter(f'{{{main_ns}}}{tag}'):
+            if element.get(attr) is not None:
+                element.set(attr, ids[element.get(attr)])
+    for view in sheet.iter(f'{{{main_ns}}}sheetView'):
+        view.attrib.pop('tabSelected', None)
+    return sheet
+
+
+def unique_sheet_name(name, used):
+    """工作表重名时在名称后加序号，与 openpyxl 新建工作表时的处理一致"""
+    candidate, n = name, 0
+    while candidate.casefold() in used:
+        n += 1
+        candidate = f'{name}{n}'
+    used.add(candidate.casefold())
+    return candidate
+
+
+def insert_sheets(source_file, output_file, sheets):
+    """
+    在已有工作簿中插入新工作表并另存：原工作表的 XML 部件原样复制，不解析单元格；
+    新工作表用 write_sheet 流式写出后合并样式表，再登记到工作簿
+    :param source_file: 原工作簿路径（.xlsx / .xlsm）
+    :param output_file: 输出文件路径
+    :param sheets: [(插在其后的原工作表名, 新工作表名, DataFrame, 样式配置)]，原工作表不存在时放在最后
+    """
+    with zipfile.ZipFile(source_file) as source:
+        names = source.namelist()
+        package_rels = etree.fromstring(source.read('_rels/.rels'))
+        workbook_part = next(resolve_target('', rel.get('Target')) for rel in package_rels
+                             if rel.get('Type') == f'{rel_ns}/officeDocument')
+        workbook_rels_part = part_rels(workbook_part)
+        workbook = etree.fromstring(source.read(workbook_part))
+        workbook_rels = etree.fromstring(source.read(workbook_rels_part))
+        content_types = etree.fromstring(source.read('[Content_Types].xml'))
+        styles_part = next(resolve_target(workbook_part, rel.get('Target')) for rel in workbook_rels
+                           if rel.get('Type') == f'{rel_ns}/styles')
+        styles = etree.fromstring(source.read(styles_part))
+
+        sheet_list = workbook.find(f'{{{main_ns}}}sheets')
+        old_sheets = list(sheet_list)
+        used_names = {sheet.get('name').casefold() for sheet in old_sheets}
+        new_names = [unique_sheet_name(new_name, used_names) for _, new_name, _, _ in sheets]
+
+        # 新工作表先写入内存中的临时工作簿，格式与 write_report 完全相同
+        buffer = io.BytesIO()
+        formats = {}
+        with xlsxwriter.Workbook(buffer, {'constant_memory': True}) as new_workbook:
+            for new_name, (_, _, df, layout) in zip(new_names, sheets):
+                write_sheet(new_workbook, formats, new_name, df, layout)
+
+        added = {}
+        with zipfile.ZipFile(buffer) as new_package:
+            xf_ids, dxf_ids = merge_styles(styles, etree.fromstring(new_package.read('xl/styles.xml')))
+            new_parts = [remap_sheet_styles(etree.fromstring(new_package.read(f'xl/worksheets/sheet{i}.xml')),
+                                            xf_ids, dxf_ids) for i in range(1, len(sheets) + 1)]
+
+        # 登记新工作表：工作表顺序、关系和内容类型
+        taken_parts = {name.casefold() for name in names}
+        rel_ids = {rel.get('Id') for rel in workbook_rels}
+        next_sheet_id = max(int(sheet.get('sheetId')) for sheet in old_sheets) + 1
+        last_inserted = {}
+        for (after_name, _, _, _), new_name, part in zip(sheets, new_names, new_parts):
+            number = 1
+            while f'xl/worksheets/sheet{number}.xml'.casefold() in taken_parts:
+                number += 1
+            part_name = f'xl/worksheets/sheet{number}.xml'
+            taken_parts.add(part_name.casefold())
+            added[part_name] = to_xml(part)
+
+            rel_number = len(rel_ids) + 1
+            while f'rId{rel_number}' in rel_ids:
+                rel_number += 1
+            rel_id = f'rId{rel_number}'
+            rel_ids.add(rel_id)
+            etree.SubElement(workbook_rels, f'{{{package_rel_ns}}}Relationship', Id=rel_id,
+                             Type=f'{rel_ns}/worksheet',
+                             Target=posixpath.relpath(part_name, posixpath.dirname(workbook_part)))
+            etree.SubElement(content_types, f'{{{content_types_ns}}}Override', PartName=f'/{part_name}',
+                             ContentType=worksheet_content_type)
+
+            sheet = etree.SubElement(sheet_list, f'{{{main_ns}}}sheet', name=new_name, sheetId=str(next_sheet_id))
+            sheet.set(f'{{{rel_ns}}}id', rel_id)
+            next_sheet_id += 1
+            anchor = last_inserted.get(after_name) or next((s for s in old_sheets if s.get('name') == after_name), None)
+            if anchor is not None:
+                anchor.addnext(sheet)
+                last_inserted[after_name] = sheet
+
+        # 按序号引用工作表的位置（打印区域等定义名称、当前工作表）随插入后移
+        positions = {i: list(sheet_list).index(sheet) for i, sheet in enumerate(old_sheets)}
+        for defined_name in workbook.iter(f'{{{main_ns}}}definedName'):
+            if defined_name.get('localSheetId') is not None:
+                defined_name.set('localSheetId', str(positions[int(defined_name.get('localSheetId'))]))
+        for view in workbook.iter(f'{{{main_ns}}}workbookView'):
+            for attr in ('activeTab', 'firstSheet'):
+                if view.get(attr) is not None:
+                    view.set(attr, str(positions[int(view.get(attr))]))
+
+        replaced = {workbook_part: to_xml(workbook), workbook_rels_part: to_xml(workbook_rels),
+                    styles_part: to_xml(styles), '[Content_Types].xml': to_xml(content_types)}
+        with zipfile.ZipFile(output_file, 'w', zipfile.ZIP_DEFLATED) as output:
+            for info in source.infolist():
+                output.writestr(info, replaced.get(info.filename) or source.read(info.filename))
+            for part_name, data in added.items():
+                output.writestr(part_name, data)
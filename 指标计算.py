@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+
+# 整体功能实现：比率类指标用“分子列 / 分母列”声明，每个指标对整列做一次 NumPy 计算，
+# 分子或分母为空、分母为 0 时结果为空
+
+# 指标定义：{指标列名: (分子列, 分母列)}，按顺序计算，后面的指标可以引用前面算出的列
+ratio_metrics = {
+    'SQL达成率': ('SQL $M', 'SQL目标'),
+    '订单转化率': ('订单 $M', 'SQL $M'),
+    '订单达成率': ('订单 $M', '订单目标'),
+}
+
+
+def to_float_array(series):
+    """转换为浮点数组，None 和无法识别的值均为 NaN"""
+    return pd.to_numeric(series, errors='coerce').to_numpy(dtype=float)
+
+
+def compute_ratio(numerator, denominator):
+    """
+    整列计算比率
+    :param numerator: 分子列
+    :param denominator: 分母列
+    :return: 浮点数组，分子或分母为空、分母为 0 的位置为 NaN
+    """
+    num = to_float_array(numerator)
+    den = to_float_array(denominator)
+    valid = ~np.isnan(num) & ~np.isnan(den) & (den != 0)
+    result = np.full(num.shape, np.nan)
+    np.divide(num, den, out=result, where=valid)
+    return result
+
+
+def apply_metrics(df, metrics=None):
+    """
+    按指标定义在 df 上新增或覆盖比率列
+    :param df: 数据
+    :param metrics: 指标定义，默认为 ratio_metrics
+    :return: df 本身
+    """
+    for name, (numerator, denominator) in (metrics or ratio_metrics).items():
+        df[name] = compute_ratio(df[numerator], df[denominator])
+    return df
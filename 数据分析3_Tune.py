@@ -1,147 +1,131 @@
-import pandas as pd
-from openpyxl import load_workbook
-from openpyxl.styles import Font, Alignment, Border, Side, numbers
-from openpyxl.utils.dataframe import dataframe_to_rows
 import os
-from datetime import datetime
-
-
-def format_sheet(sheet):
-    # 设置默认字体和对齐
-    font = Font(name='微软雅黑', size=11)
-    alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
-    thin_border = Border(left=Side(style='thin'),
-                         right=Side(style='thin'),
-                         top=Side(style='thin'),
-                         bottom=Side(style='thin'))
-
-    # 设置首行格式
-    for cell in sheet[1]:
-        cell.font = Font(name='微软雅黑', size=11, bold=True)
-        cell.alignment = alignment
-        cell.border = thin_border
-    sheet.row_dimensions[1].height = 32
-
-    # 设置列宽
-    for col in sheet.columns:
-        column_letter = col[0].column_letter
-        sheet.column_dimensions[column_letter].width = 10
-
-    # 设置所有单元格格式
-    for row in sheet.iter_rows(min_row=2):
-        for cell in row:
-            cell.font = font
-            cell.alignment = alignment
-            cell.border = thin_border
-
-    # 设置数值格式
-    format_columns = {
-        'SQL $M': numbers.FORMAT_NUMBER_00,
-        '订单 $M': numbers.FORMAT_NUMBER_00,
-        '商机 $M': numbers.FORMAT_NUMBER_00,
-        'SQL达成率': '0.00%',
-        '订单转化率': '0.00%',
-        '订单达成率': '0.00%',
-        '单站产出': '0.00',
-        '较上周单站产出': '0.00'
-    }
-
-    header = [cell.value for cell in sheet[1]]
-    for idx, title in enumerate(header, 1):
-        col_letter = chr(64 + idx)
-        if title in format_columns:
-            for cell in sheet[col_letter][1:]:  # 从第二行开始
-                if '达成率' in title or '转化率' in title:
-                    if cell.value is not None:
-                        cell.number_format = format_columns[title]
-                else:
-                    cell.number_format = format_columns[title]
-
-    # 设置行高
-    for row in range(2, sheet.max_row + 1):
-        sheet.row_dimensions[row].height = 22.5
-
-
-# 确保以下代码顶格写（不在函数体内）
-folder_path = input("请输入文件夹的路径：")
-if not os.path.exists(folder_path) or not os.path.isdir(folder_path):
-    print("输入的路径不是有效的文件夹。")
-else:
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from 进程池 import run_in_process
+from 快照存储 import read_workbook_cached
+from 汇总行 import drop_summary_rows
+from 区域汇总 import build_rollup_cube, diff_column, mean_columns, rollup_levels, slice_level, sum_columns
+from 汇总缓存 import cache_stats, get_or_compute
+from 报表写入 import achievement_layout, detail_layout, insert_sheets
+
+# 并行处理文件的进程数，设为 1 即逐个处理
+file_workers = os.cpu_count() or 1
+
+
+def build_region_detail(df):
+    """
+    由去除汇总行后的明细生成区域详情
+    :param df: 明细数据
+    :return: 区域详情 DataFrame
+    """
+    # 一次分组得到地区、大区、全国各层级的汇总，区域详情取大区层级
+    cube = build_rollup_cube(df)
+    summary_df = slice_level(cube, '大区')
+
+    # 没有订单差额列时无法计算较上周单站产出
+    if '较上周单站产出' not in summary_df.columns:
+        summary_df['较上周单站产出'] = None
+
+    # 调整列顺序，将站点数量放到第12列
+    columns = summary_df.columns.tolist()
+    columns.remove('站点数量')
+    new_columns_order = columns[:11] + ['站点数量'] + columns[11:]
+    summary_df = summary_df[new_columns_order]
+
+    # 新增空列（如果前面计算没涉及到的话）
+    new_columns = ['单站产出', '较上周单站产出', '站点数量', '上周站点数量']
+    for col in new_columns:
+        if col not in summary_df.columns:
+            summary_df[col] = None
+
+    return summary_df
+
+
+def summarize_regions(source_df, summary_mask=None):
+    """
+    以大区为逻辑汇总达成率报表的一个工作表，生成区域详情；参与汇总的列内容不变时直接读取缓存
+    :param source_df: 达成率报表工作表
+    :param summary_mask: 已算出的汇总行掩码，为空时现算
+    :return: 区域详情 DataFrame
+    """
+    # 去除汇总行数据
+    df = drop_summary_rows(source_df, summary_mask)
+    input_columns = [col for col in rollup_levels + sum_columns + mean_columns + [diff_column] if col in df.columns]
+    return get_or_compute('区域详情', df, input_columns, lambda: build_region_detail(df))
+
+
+def build_detail_sheets(source_sheets, summary_masks=None):
+    """
+    为每个工作表生成区域详情，新工作表紧跟在原工作表之后
+    :param source_sheets: {工作表名: 达成率报表 DataFrame}
+    :param summary_masks: {工作表名: 汇总行掩码}，由前面的步骤传入时不再重复识别
+    :return: [(工作表名, DataFrame, 样式配置)]
+    """
+    summary_masks = summary_masks or {}
+    sheets = []
+    for sheet_name, source_df in source_sheets.items():
+        # 原工作表按达成率报表的样式写回，汇总在副本上进行
+        sheets.append((sheet_name, source_df, achievement_layout))
+        sheets.append((f'{sheet_name}-区域详情', summarize_regions(source_df, summary_masks.get(sheet_name)), detail_layout))
+    return sheets
+
+
+def process_file(file_path, desktop_path):
+    """
+    处理单个工作簿：读取、汇总、写出，可在子进程中运行
+    :param file_path: 工作簿路径
+    :param desktop_path: 输出目录
+    :return: 进度报告中的一行说明
+    """
+    # 工作簿只解析一次，未改动的文件直接读取列式副本
+    start = time.perf_counter()
+    source_sheets, from_cache = read_workbook_cached(file_path)
+    read_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    hits = cache_stats['hit']
+    details = {sheet_name: summarize_regions(source_df) for sheet_name, source_df in source_sheets.items()}
+    summary_seconds = time.perf_counter() - start
+    cached_sheets = cache_stats['hit'] - hits
+
+    # 原工作表（样式、公式、日期格式等）的 XML 原样复制，不再解析带样式的工作簿；区域详情插入到对应工作表之后
+    start = time.perf_counter()
+    save_file_path = os.path.join(desktop_path, f'处理后的_{os.path.basename(file_path)}')
+    insert_sheets(file_path, save_file_path, [(sheet_name, f'{sheet_name}-区域详情', detail_df, detail_layout)
+                                              for sheet_name, detail_df in details.items()])
+    write_seconds = time.perf_counter() - start
+    return (f"文件已保存到: {save_file_path}\n"
+            f"读取 {read_seconds:.2f} 秒（{'列式副本' if from_cache else '解析工作簿'}），"
+            f"汇总 {summary_seconds:.2f} 秒（{cached_sheets}/{len(source_sheets)} 个工作表来自缓存），写入 {write_seconds:.2f} 秒")
+
+
+def main():
+    folder_path = input("请输入文件夹的路径：")
+    if not os.path.exists(folder_path) or not os.path.isdir(folder_path):
+        print("输入的路径不是有效的文件夹。")
+        return
+
     desktop_path = os.path.join(os.path.expanduser("~"), "Desktop")
     excel_files = [os.path.join(folder_path, f) for f in os.listdir(folder_path) if f.lower().endswith(('.xlsx', '.xlsm'))]
 
-    for file_path in excel_files:
-        try:
-            wb = load_workbook(file_path)
-
-            for sheet_name in wb.sheetnames:
-                df = pd.read_excel(file_path, sheet_name=sheet_name)
-
-                # 假设汇总行是最后一行，去除汇总行数据
-                if df.apply(lambda row: row.astype(str).str.contains('汇总|总计').any(), axis=1).any():
-                    df = df[~df.apply(lambda row: row.astype(str).str.contains('汇总|总计').any(), axis=1)]
-
-                # 将需要汇总的列转换为数值类型
-                columns_to_sum = ['SQL $M', '订单 $M', '商机 $M', '高价值客户覆盖数']
-                columns_to_average = ['SQL达成率', '订单转化率', '订单达成率']
-                for col in columns_to_sum + columns_to_average:
-                    df[col] = pd.to_numeric(df[col], errors='coerce')
-
-                # 统计站点数量
-                site_counts = df.groupby('大区').size().reset_index(name='站点数量')
-
-                # 以大区为逻辑进行数据汇总
-                summary_df = df.groupby('大区', as_index=False).agg({
-                    'SQL $M': 'sum',
-                    '订单 $M': 'sum',
-                    '商机 $M': 'sum',
-                    '高价值客户覆盖数': 'sum',
-                    'SQL达成率': 'mean',
-                    '订单转化率': 'mean',
-                    '订单达成率': 'mean'
-                })
-
-                # 合并站点数量数据
-                summary_df = summary_df.merge(site_counts, on='大区')
-
-                # 计算单站产出
-                summary_df['单站产出'] = (summary_df['订单 $M'] / summary_df['站点数量']).round(2)
-
-                # 假设订单差额列名为订单 $M 差额，计算较上周单站产出
-                if '订单 $M 差额' in df.columns:
-                    order_diff_sum = df.groupby('大区')['订单 $M 差额'].sum().reset_index(name='订单 $M 差额总和')
-                    summary_df = summary_df.merge(order_diff_sum, on='大区')
-                    summary_df['较上周单站产出'] = (summary_df['订单 $M 差额总和'] / summary_df['站点数量']).round(2)
-                else:
-                    summary_df['较上周单站产出'] = None
-
-                # 调整列顺序，将站点数量放到第12列
-                columns = summary_df.columns.tolist()
-                columns.remove('站点数量')
-                new_columns_order = columns[:11] + ['站点数量'] + columns[11:]
-                summary_df = summary_df[new_columns_order]
-
-                # 新增空列（如果前面计算没涉及到的话）
-                new_columns = ['单站产出', '较上周单站产出', '站点数量', '上周站点数量']
-                for col in new_columns:
-                    if col not in summary_df.columns:
-                        summary_df[col] = None
-
-                # 创建新sheet
-                new_sheet_name = f'{sheet_name}-区域详情'
-                idx = wb.sheetnames.index(sheet_name) + 1
-                new_sheet = wb.create_sheet(new_sheet_name, idx)
-
-                # 写入数据
-                for r in dataframe_to_rows(summary_df, index=False, header=True):
-                    new_sheet.append(r)
-
-                # 应用格式
-                format_sheet(new_sheet)
-
-            save_file_path = os.path.join(desktop_path, f'处理后的_{os.path.basename(file_path)}')
-            wb.save(save_file_path)
-            print(f"文件已保存到: {save_file_path}")
-
-        except Exception as e:
-            print(f"处理文件时发生错误: {e}")
\ No newline at end of file
+    # 各文件互不依赖，在进程池中并行处理；进度按文件顺序输出，单个文件出错不影响其他文件
+    start = time.perf_counter()
+    workers = min(len(excel_files), file_workers)
+    with ProcessPoolExecutor(max_workers=workers) if workers > 1 else nullcontext() as executor:
+        submit = executor.submit if executor else run_in_process
+        futures = [submit(process_file, file_path, desktop_path) for file_path in excel_files]
+        for i, (file_path, future) in enumerate(zip(excel_files, futures), start=1):
+            try:
+                report = future.result()
+                print(f"[{i}/{len(excel_files)}] {os.path.basename(file_path)}\n{report}")
+            except Exception as e:
+                print(f"[{i}/{len(excel_files)}] {os.path.basename(file_path)}\n处理文件时发生错误: {e}")
+    print(f"共处理 {len(excel_files)} 个文件，总耗时 {time.perf_counter() - start:.2f} 秒")
+
+
+if __name__ == "__main__":
+    # 打包为 exe 后子进程需要此调用才能正常启动
+    multiprocessing.freeze_support()
+    main()
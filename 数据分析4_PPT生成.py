@@ -5,10 +5,14 @@ from pptx.enum.chart import XL_CHART_TYPE
 from pptx.util import Inches, Pt
 from pptx.enum.text import PP_ALIGN
 import os
+import json
+import zipfile
+import xml.etree.ElementTree as ET
 from pathlib import Path
 from pptx.enum.dml import MSO_LINE_DASH_STYLE
 from pptx.dml.color import RGBColor
 from pptx.enum.shapes import MSO_SHAPE
+from 汇总缓存 import cache_dir, content_key
 
 # 定义可能的工作表名称，根据实际数据调整
 possible_sheet_names = {
@@ -18,9 +22,16 @@ possible_sheet_names = {
     '创新之旅-区域详情': ['创新之旅-区域详情']
 }
 
+# 工作表目录缓存：{文件路径: {大小、修改时间、工作表名称列表}}
+sheet_index_file = os.path.join(cache_dir, '工作表目录.json')
+
+# 幻灯片版式变化时修改版本号，使旧 PPT 中的幻灯片全部重新生成
+slide_version = 1
+
 # 定义可能的列名，根据实际数据调整
 possible_column_names = {
     '大区': ['大区'],
+    '地区': ['地区'],
     '订单 $M': ['订单 $M']
 }
 
@@ -34,11 +45,89 @@ def find_excel_files(folder_path):
     excel_files = []
     for root, dirs, files in os.walk(folder_path):
         for file in files:
-            if file.lower().endswith(('.xlsx', '.xls')):
+            if file.lower().endswith(('.xlsx', '.xls')) and not file.startswith('~$'):
                 excel_files.append(os.path.join(root, file))
     return excel_files
 
 
+def read_sheet_names(file_path):
+    """
+    只读取 xlsx 压缩包中的 xl/workbook.xml 获取工作表名称，不解析任何单元格；
+    xls 等非压缩包格式退回 pd.ExcelFile
+    :param file_path: Excel 文件路径
+    :return: 工作表名称列表
+    """
+    if not zipfile.is_zipfile(file_path):
+        with pd.ExcelFile(file_path) as xls:
+            return xls.sheet_names
+    sheet_names = []
+    with zipfile.ZipFile(file_path) as archive:
+        with archive.open('xl/workbook.xml') as f:
+            for _, element in ET.iterparse(f):
+                tag = element.tag.rsplit('}', 1)[-1]
+                if tag == 'sheet':
+                    sheet_names.append(element.get('name'))
+                elif tag == 'sheets':
+                    # 工作表目录之后的内容不需要
+                    break
+    return sheet_names
+
+
+def load_sheet_index():
+    """读取工作表目录缓存，不存在或损坏时返回空字典"""
+    if not os.path.exists(sheet_index_file):
+        return {}
+    try:
+        with open(sheet_index_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"工作表目录缓存无法读取，将重新扫描: {e}")
+        return {}
+
+
+def save_sheet_index(sheet_index):
+    """先写临时文件再替换，避免中断时留下半个缓存文件"""
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        temp_path = f'{sheet_index_file}.{os.getpid()}.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(sheet_index, f, ensure_ascii=False)
+        os.replace(temp_path, sheet_index_file)
+    except OSError as e:
+        print(f"工作表目录缓存无法保存: {e}")
+
+
+def filter_target_files(excel_files):
+    """
+    预扫描工作表目录，只保留包含目标工作表的文件；文件路径、大小和修改时间不变时直接使用缓存
+    :param excel_files: Excel 文件列表
+    :return: 包含目标工作表的文件列表
+    """
+    target_names = {alt_name for alternatives in possible_sheet_names.values() for alt_name in alternatives}
+    sheet_index = load_sheet_index()
+    target_files = []
+    scanned = 0
+    for file_path in excel_files:
+        key = os.path.abspath(file_path)
+        try:
+            stat = os.stat(file_path)
+            entry = sheet_index.get(key)
+            if not entry or entry['size'] != stat.st_size or entry['mtime'] != stat.st_mtime:
+                entry = {'size': stat.st_size, 'mtime': stat.st_mtime, 'sheets': read_sheet_names(file_path)}
+                sheet_index[key] = entry
+                scanned += 1
+        except Exception as e:
+            print(f"读取文件 '{file_path}' 的工作表目录时出现错误: {e}")
+            continue
+        if target_names.intersection(entry['sheets']):
+            target_files.append(file_path)
+    if scanned:
+        save_sheet_index(sheet_index)
+    print(f"共 {len(excel_files)} 个 Excel 文件（{len(excel_files) - scanned} 个使用目录缓存），"
+          f"其中 {len(target_files)} 个包含区域详情工作表")
+    return target_files
+
+
 def read_excel(file_path):
     """
     读取 Excel 文件中指定工作表的数据
@@ -65,17 +154,36 @@ def read_excel(file_path):
     return data
 
 
-def create_charts(slide, df, order_amount_col):
+def get_chart_series(df, order_amount_col, category_col='大区'):
+    """
+    取出图表所需的分类、数值、平均值和最大值
+    :param df: 数据 DataFrame
+    :param order_amount_col: 订单金额列名
+    :param category_col: 分类列名
+    :return: 图表数据字典
+    """
+    return {
+        'categories': df[category_col].tolist(),
+        'values': df[order_amount_col].tolist(),
+        'mean': df[order_amount_col].mean(),
+        'max': df[order_amount_col].max(),
+    }
+
+
+def create_charts(slide, df, order_amount_col, category_col='大区'):
     """
     在幻灯片中创建饼图和柱状图
     :param slide: 幻灯片对象
     :param df: 数据 DataFrame
     :param order_amount_col: 订单金额列名
+    :param category_col: 分类列名
     """
+    series = get_chart_series(df, order_amount_col, category_col)
+
     # 创建饼图
     pie_chart_data = ChartData()
-    pie_chart_data.categories = df['大区']
-    pie_chart_data.add_series('订单金额 $M', df[order_amount_col])
+    pie_chart_data.categories = series['categories']
+    pie_chart_data.add_series('订单金额 $M', series['values'])
 
     left = Inches(0.5)
     top = Inches(1.5)
@@ -91,8 +199,8 @@ def create_charts(slide, df, order_amount_col):
 
     # 创建柱状图
     bar_chart_data = CategoryChartData()
-    bar_chart_data.categories = df['大区']
-    bar_chart_data.add_series('订单金额 $M', df[order_amount_col])
+    bar_chart_data.categories = series['categories']
+    bar_chart_data.add_series('订单金额 $M', series['values'])
 
     left = Inches(5)
     top = Inches(1.5)
@@ -105,7 +213,7 @@ def create_charts(slide, df, order_amount_col):
     bar_chart.legend.include_in_layout = False
 
     # 添加平均值线
-    mean_value = df[order_amount_col].mean()
+    mean_value = series['mean']
     value_axis = bar_chart.value_axis
     # 修改为设置 has_major_gridlines 属性来显示网格线
     value_axis.has_major_gridlines = True
@@ -114,7 +222,7 @@ def create_charts(slide, df, order_amount_col):
 
     # 手动计算平均值线的位置
     value_min = value_axis.minimum_scale if value_axis.minimum_scale is not None else 0
-    value_max = value_axis.maximum_scale if value_axis.maximum_scale is not None else df[order_amount_col].max()
+    value_max = value_axis.maximum_scale if value_axis.maximum_scale is not None else series['max']
     y_mean = height * (1 - (mean_value - value_min) / (value_max - value_min))
 
     # 绘制平均值线
@@ -129,28 +237,99 @@ def create_charts(slide, df, order_amount_col):
     line.line.dash_style = MSO_LINE_DASH_STYLE.DASH
 
 
-def create_ppt(data, output_path):
+def find_column(df, names):
+    """按 possible_column_names 中的顺序查找实际列名，找不到时返回 None"""
+    for name in names:
+        for alt_col in possible_column_names[name]:
+            if alt_col in df.columns:
+                return alt_col
+    return None
+
+
+def find_order_amount_col(df):
+    """查找实际的订单金额列名，找不到时返回 None"""
+    return find_column(df, ['订单 $M'])
+
+
+def find_category_col(df):
+    """查找图表的分类列，优先按大区，没有大区列时按地区"""
+    return find_column(df, ['大区', '地区'])
+
+
+def slide_fingerprint(sheet_name, df, order_amount_col, category_col='大区'):
+    """由标题、版式版本以及分类和订单金额两列内容计算幻灯片指纹"""
+    return content_key(f'幻灯片|{slide_version}|{sheet_name}|{category_col}', df, [category_col, order_amount_col])
+
+
+def read_slide_manifest(prs):
+    """
+    读取上次生成时写入幻灯片名称的“工作表名|指纹”
+    :return: 与幻灯片一一对应的 [(工作表名, 指纹)]，不是本程序生成的幻灯片为 (None, None)
     """
-    创建 PPT 文件
-    :param data: 包含工作表数据的字典
+    manifest = []
+    for slide in prs.slides:
+        sheet_name, _, fingerprint = slide.name.rpartition('|')
+        manifest.append((sheet_name, fingerprint) if sheet_name else (None, None))
+    return manifest
+
+
+def open_previous_ppt(output_path):
+    """打开上次生成的 PPT，返回 (Presentation, 幻灯片清单)，不存在或无法读取时返回 (None, None)"""
+    if not os.path.exists(output_path):
+        return None, None
+    try:
+        prs = Presentation(output_path)
+    except Exception as e:
+        print(f"无法读取已有 PPT，将完整重新生成: {e}")
+        return None, None
+    return prs, read_slide_manifest(prs)
+
+
+def create_ppt(data, output_path, incremental=True, template=None):
+    """
+    创建 PPT 文件；增量模式下保留上次 PPT 中数据未变化的幻灯片（含图表），只重新生成数据变化的幻灯片
+    :param data: 包含工作表数据的字典，图表按大区列分类，没有大区列时按地区列分类
     :param output_path: PPT 保存路径
+    :param incremental: 是否复用已有 PPT 中未变化的幻灯片
+    :param template: 模板 PPT 的路径或文件对象，默认使用空白模板；模板中原有的幻灯片不保留
+    :return: (复用的幻灯片数, 幻灯片总数)
     """
-    prs = Presentation()
+    prs, manifest = open_previous_ppt(output_path) if incremental else (None, None)
+    if prs is None:
+        prs = Presentation(template)
+        manifest = read_slide_manifest(prs)
     title_layout = prs.slide_layouts[1]  # 使用标题和内容布局
+    sld_id_lst = prs.slides._sldIdLst
+    # 上次的幻灯片：{工作表名: (幻灯片 ID 元素, 指纹)}；不是本程序生成的幻灯片直接删除
+    previous = {}
+    stale = []
+    for (sheet_name, fingerprint), sld_id in zip(manifest, sld_id_lst):
+        if sheet_name is None or sheet_name in previous:
+            stale.append(sld_id)
+        else:
+            previous[sheet_name] = (sld_id, fingerprint)
 
+    slide_order = []
+    reused = 0
     for sheet_name in data:
         df = data[sheet_name]
-        # 查找实际的订单金额列名
-        order_amount_col = None
-        for alt_col in possible_column_names['订单 $M']:
-            if alt_col in df.columns:
-                order_amount_col = alt_col
-                break
+        order_amount_col = find_order_amount_col(df)
         if order_amount_col is None:
             print(f"工作表 '{sheet_name}' 中未找到订单金额列，将跳过该幻灯片。")
             continue
+        category_col = find_category_col(df)
+        if category_col is None:
+            print(f"工作表 '{sheet_name}' 中未找到大区或地区列，将跳过该幻灯片。")
+            continue
+
+        fingerprint = slide_fingerprint(sheet_name, df, order_amount_col, category_col)
+        if sheet_name in previous and previous[sheet_name][1] == fingerprint:
+            slide_order.append(previous.pop(sheet_name)[0])
+            reused += 1
+            continue
 
         slide = prs.slides.add_slide(title_layout)
+        slide_order.append(sld_id_lst[-1])
         title = slide.shapes.title
         if title is not None:
             title.text = sheet_name
@@ -159,9 +338,23 @@ def create_ppt(data, output_path):
             print(f"无法为幻灯片 '{sheet_name}' 设置标题。")
             continue
 
-        create_charts(slide, df, order_amount_col)
+        create_charts(slide, df, order_amount_col, category_col)
+        # 图表生成后才把指纹写入幻灯片名称（随 PPT 一起保存），不完整的幻灯片下次会重新生成
+        slide._element.cSld.set('name', f'{sheet_name}|{fingerprint}')
+
+    # 删除数据已变化或已不存在的旧幻灯片，其图表和内嵌工作簿不再被引用，保存时一并去掉
+    stale.extend(sld_id for sld_id, _ in previous.values())
+    for sld_id in stale:
+        prs.part.drop_rel(sld_id.rId)
+    for sld_id in list(sld_id_lst):
+        sld_id_lst.remove(sld_id)
+    for sld_id in slide_order:
+        sld_id_lst.append(sld_id)
+    # 幻灯片文件名按新顺序重新编号
+    prs.part.rename_slide_parts([sld_id.rId for sld_id in sld_id_lst])
 
     prs.save(output_path)
+    return reused, len(slide_order)
 
 
 def main():
@@ -180,6 +373,9 @@ def main():
         print("输入的路径不是有效的 Excel 文件路径或文件夹路径，请检查后重新运行程序。")
         return
 
+    # 先只读工作表目录，完整解析的只有包含区域详情工作表的文件
+    excel_files = filter_target_files(excel_files)
+
     all_data = {}
     for file_path in excel_files:
         data = read_excel(file_path)
@@ -187,8 +383,8 @@ def main():
             continue
         all_data.update(data)
 
-    create_ppt(all_data, output_ppt)
-    print(f"PPT 已生成：{output_ppt}")
+    reused, total = create_ppt(all_data, output_ppt)
+    print(f"PPT 已生成：{output_ppt}（复用 {reused} 张未变化的幻灯片，重新生成 {total - reused} 张）")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,92 @@
+import hashlib
+import os
+import pickle
+
+import pandas as pd
+
+# 整体功能实现：按参与计算的列内容计算哈希，把汇总结果保存到磁盘，数据未变化的工作表直接读取缓存；
+# 缓存总大小超过上限时按最近使用时间淘汰
+
+cache_dir = os.path.join(os.path.expanduser("~"), ".周报缓存")
+# 缓存总大小上限（字节）
+cache_size_limit = 256 * 1024 * 1024
+# 汇总逻辑变化时修改版本号，使旧缓存失效
+cache_version = 1
+
+# 本进程内的命中统计
+cache_stats = {'hit': 0, 'miss': 0}
+
+
+def content_key(kind, df, columns):
+    """
+    由汇总类型、列名、列类型和列内容计算缓存键
+    :param kind: 汇总类型，不同汇总的结果互不混用
+    :param df: 数据
+    :param columns: 参与计算的列
+    :return: 十六进制字符串
+    """
+    digest = hashlib.sha256(f'{cache_version}|{kind}|'.encode('utf-8'))
+    for col in columns:
+        digest.update(f'{col}|{df[col].dtype}|'.encode('utf-8'))
+    if columns and len(df):
+        digest.update(pd.util.hash_pandas_object(df[columns], index=False).to_numpy().tobytes())
+    digest.update(str(len(df)).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def evict(directory, size_limit):
+    """缓存总大小超过上限时，从最久未使用的文件开始删除"""
+    entries = []
+    for name in os.listdir(directory):
+        if name.endswith('.pkl'):
+            path = os.path.join(directory, name)
+            stat = os.stat(path)
+            entries.append((stat.st_mtime, stat.st_size, path))
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= size_limit:
+            break
+        try:
+            os.remove(path)
+            total -= size
+        except OSError:
+            pass
+
+
+def get_or_compute(kind, df, columns, compute, directory=None, size_limit=None):
+    """
+    读取缓存的汇总结果，没有时计算并写入缓存
+    :param kind: 汇总类型
+    :param df: 数据
+    :param columns: 参与计算的列，只有这些列的内容影响缓存键
+    :param compute: 无参函数，缓存未命中时调用
+    :param directory: 缓存目录，默认为 cache_dir
+    :param size_limit: 缓存总大小上限，默认为 cache_size_limit
+    :return: compute 的结果
+    """
+    directory = directory or cache_dir
+    path = os.path.join(directory, content_key(kind, df, columns) + '.pkl')
+    if os.path.exists(path):
+        try:
+            with open(path, 'rb') as f:
+                result = pickle.load(f)
+            # 更新修改时间作为最近使用时间
+            os.utime(path)
+            cache_stats['hit'] += 1
+            return result
+        except Exception as e:
+            print(f"汇总缓存无法读取，将重新计算: {e}")
+
+    cache_stats['miss'] += 1
+    result = compute()
+    try:
+        os.makedirs(directory, exist_ok=True)
+        # 先写临时文件再替换，并行写入同一结果时不会读到半个文件
+        temp_path = f'{path}.{os.getpid()}.tmp'
+        with open(temp_path, 'wb') as f:
+            pickle.dump(result, f)
+        os.replace(temp_path, path)
+        evict(directory, size_limit or cache_size_limit)
+    except OSError as e:
+        print(f"汇总缓存无法保存: {e}")
+    return result
@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+
+# 整体功能实现：识别“汇总”“总计”行，只检查文本列（或指定的标签列、末尾若干行），
+# 所有列拼接后做一次向量化正则匹配，得到的布尔掩码可在各步骤间共用
+
+summary_pattern = '汇总|总计'
+
+
+def find_summary_rows(df, label_columns=None, tail=None, pattern=summary_pattern):
+    """
+    找出汇总行
+    :param df: 数据
+    :param label_columns: 只检查这些列，默认检查全部文本列（数值列不可能包含汇总字样）
+    :param tail: 只检查末尾若干行，默认检查全部行
+    :param pattern: 汇总行的正则
+    :return: 与 df 行一一对应的布尔数组
+    """
+    mask = np.zeros(len(df), dtype=bool)
+    if label_columns is None:
+        label_columns = [col for col in df.columns if not pd.api.types.is_numeric_dtype(df[col])]
+    label_columns = [col for col in label_columns if col in df.columns]
+    if not label_columns or not len(df):
+        return mask
+
+    start = max(len(df) - tail, 0) if tail else 0
+    labels = [df[col].iloc[start:].astype('string') for col in label_columns]
+    # 用不会出现在数据中的分隔符拼接各列，整块只匹配一次
+    combined = labels[0].str.cat(labels[1:], sep='\x1f', na_rep='') if len(labels) > 1 else labels[0].fillna('')
+    mask[start:] = combined.str.contains(pattern, regex=True).to_numpy(dtype=bool)
+    return mask
+
+
+def drop_summary_rows(df, mask=None):
+    """
+    去除汇总行
+    :param df: 数据
+    :param mask: find_summary_rows 已算出的掩码，为空时现算
+    :return: 去除汇总行后的 DataFrame
+    """
+    if mask is None:
+        mask = find_summary_rows(df)
+    return df[~mask] if mask.any() else df
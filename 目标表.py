@@ -0,0 +1,127 @@
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+
+# 整体功能实现：读取按线索3级来源、地区或大区设定的目标表，编译为哈希索引后整表批量填充目标列，
+# 编译结果缓存到目标文件旁边，目标文件改动前的后续运行直接复用
+
+# 目标表中可用的匹配列，从最具体到最笼统；同一行同时命中多个级别时以最具体的为准
+target_levels = ['线索3级来源', '地区', '大区']
+target_columns = ['SQL目标', '订单目标', '高价值客户覆盖目标']
+
+# 编译格式变化时修改版本号，使旧缓存失效
+cache_version = 1
+
+# 同一进程内多次加载同一目标表时直接复用
+loaded_targets = {}
+
+
+def get_cache_path(target_file):
+    return target_file + '.cache.pkl'
+
+
+def get_file_stamp(target_file):
+    stat = os.stat(target_file)
+    return stat.st_size, stat.st_mtime
+
+
+def read_target_file(target_file):
+    """读取 CSV 或 Excel 格式的目标表，Excel 只读取第一个工作表"""
+    if target_file.lower().endswith('.csv'):
+        return pd.read_csv(target_file, encoding='utf-8-sig')
+    return pd.read_excel(target_file)
+
+
+def normalize_keys(series):
+    """匹配键统一为去掉首尾空格的字符串，空值和空字符串为 None"""
+    keys = series.astype('string').str.strip()
+    valid = keys.ne('').fillna(False).astype(bool)
+    return keys.astype(object).where(valid, None)
+
+
+def compile_targets(target_df):
+    """
+    将目标表编译为各级别的哈希索引
+    :param target_df: 目标表
+    :return: {级别列: (pd.Index 匹配键, {目标列: 目标值数组})}
+    """
+    columns = [col for col in target_columns if col in target_df.columns]
+    if not columns:
+        raise ValueError(f"目标表中没有目标列，需要至少包含 {'、'.join(target_columns)} 中的一列")
+    levels = [level for level in target_levels if level in target_df.columns]
+    if not levels:
+        raise ValueError(f"目标表中没有匹配列，需要至少包含 {'、'.join(target_levels)} 中的一列")
+
+    keys = pd.DataFrame({level: normalize_keys(target_df[level]) for level in levels})
+    # 每行只归入填写了的最具体的级别
+    assigned = pd.Series(False, index=target_df.index)
+    compiled = {}
+    for level in levels:
+        rows = keys[level].notna() & ~assigned
+        assigned |= rows
+        level_df = target_df.loc[rows, columns].apply(pd.to_numeric, errors='coerce')
+        level_df.index = keys.loc[rows, level]
+        # 同一匹配键出现多次时以最后一行为准
+        level_df = level_df[~level_df.index.duplicated(keep='last')]
+        compiled[level] = (pd.Index(level_df.index), {col: level_df[col].to_numpy(dtype=float) for col in columns})
+    return compiled
+
+
+def load_targets(target_file):
+    """
+    加载编译后的目标索引，目标文件的大小和修改时间不变时直接读取缓存
+    :param target_file: 目标表路径（.csv / .xlsx）
+    :return: compile_targets 的结果
+    """
+    stamp = get_file_stamp(target_file)
+    memory_key = (os.path.abspath(target_file), stamp)
+    if memory_key in loaded_targets:
+        return loaded_targets[memory_key]
+
+    cache_path = get_cache_path(target_file)
+    if os.path.exists(cache_path):
+        try:
+            with open(cache_path, 'rb') as f:
+                cached = pickle.load(f)
+            if cached['version'] == cache_version and cached['stamp'] == stamp:
+                loaded_targets[memory_key] = cached['compiled']
+                return cached['compiled']
+        except Exception as e:
+            print(f"目标缓存无法读取，将重新编译: {e}")
+
+    compiled = compile_targets(read_target_file(target_file))
+    try:
+        with open(cache_path, 'wb') as f:
+            pickle.dump({'version': cache_version, 'stamp': stamp, 'compiled': compiled}, f)
+    except OSError as e:
+        print(f"目标缓存无法保存: {e}")
+    loaded_targets[memory_key] = compiled
+    return compiled
+
+
+def fill_targets(df, compiled):
+    """
+    按匹配键批量填充目标列，先填笼统级别，再由更具体的级别覆盖；没有匹配到的保持原值
+    :param df: 需要填充的数据，需包含对应的匹配列
+    :param compiled: load_targets 的结果
+    :return: df 本身
+    """
+    for level in reversed(target_levels):
+        if level not in compiled or level not in df.columns:
+            continue
+        index, values = compiled[level]
+        positions = index.get_indexer(normalize_keys(df[level]))
+        matched = positions >= 0
+        if not matched.any():
+            continue
+        for col, target_values in values.items():
+            filled = pd.to_numeric(df[col], errors='coerce').to_numpy(dtype=float, copy=True) if col in df.columns else np.full(len(df), np.nan)
+            # 目标值为空时不覆盖笼统级别已填的目标
+            rows = np.flatnonzero(matched)
+            taken = target_values[positions[rows]]
+            has_value = ~np.isnan(taken)
+            filled[rows[has_value]] = taken[has_value]
+            df[col] = filled
+    return df
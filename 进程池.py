@@ -0,0 +1,16 @@
+from concurrent.futures import Future
+
+# 整体功能实现：各脚本共用的进程池辅助函数，进程数设为 1 时不创建进程池，在当前进程中按相同方式执行
+
+
+def run_in_process(func, *args):
+    """
+    在当前进程中直接执行，返回已完成的 Future，与进程池的 submit 用法一致，
+    进程数设为 1 时用来代替进程池
+    """
+    future = Future()
+    try:
+        future.set_result(func(*args))
+    except Exception as e:
+        future.set_exception(e)
+    return future